@@ -0,0 +1,69 @@
+"""Giveaway entry storage: the old list against EntrySet.
+
+Run from the repository root:
+
+    python -m benchmarks.giveaway_entries_bench --entrants 100000
+"""
+import argparse
+import json
+import random
+import time
+
+from utils.giveaway_draw import SeededDraw, new_seed
+from utils.giveaway_entries import EntrySet
+
+
+def enter_all(entries, user_ids, add) -> float:
+    # Every click checks for a duplicate first, then records the entry
+    start = time.perf_counter()
+    for user_id in user_ids:
+        if user_id not in entries:
+            add(user_id)
+    return time.perf_counter() - start
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def run(entrants: int, winners: int, list_limit: int):
+    rng = random.Random(0)
+    # Discord snowflakes are ~19 digits; include some double clicks
+    user_ids = [rng.randrange(10 ** 17, 10 ** 19) for _ in range(entrants)]
+    clicks = user_ids + rng.sample(user_ids, entrants // 10)
+
+    entry_set = EntrySet()
+    set_elapsed = enter_all(entry_set, clicks, entry_set.add)
+    print(f"EntrySet: {len(clicks):,} clicks in {set_elapsed * 1000:.1f}ms "
+          f"({set_elapsed / len(clicks) * 1e6:.2f}us per click)")
+
+    # The list is quadratic, so only time a prefix of the burst and scale it
+    list_clicks = clicks[:list_limit]
+    entry_list = []
+    list_elapsed = enter_all(entry_list, list_clicks, entry_list.append)
+    print(f"list:     {len(list_clicks):,} clicks in {list_elapsed * 1000:.1f}ms "
+          f"({list_elapsed / len(list_clicks) * 1e6:.2f}us per click, grows with every entrant)")
+
+    packed, pack_elapsed = timed(entry_set.pack)
+    _, unpack_elapsed = timed(lambda: EntrySet.unpack(packed))
+    as_json, json_elapsed = timed(lambda: json.dumps(list(entry_set)))
+    _, json_load_elapsed = timed(lambda: EntrySet(json.loads(as_json)))
+    print(f"pack:     {len(packed) / 1024:.0f} KiB, save {pack_elapsed * 1000:.1f}ms, load {unpack_elapsed * 1000:.1f}ms")
+    print(f"json:     {len(as_json) / 1024:.0f} KiB, save {json_elapsed * 1000:.1f}ms, load {json_load_elapsed * 1000:.1f}ms")
+
+    draw = SeededDraw(new_seed(), len(entry_set))
+    drawn, draw_elapsed = timed(lambda: [entry_set[draw.next()] for _ in range(min(winners, len(entry_set)))])
+    assert len(set(drawn)) == len(drawn) == min(winners, len(entry_set))
+    _, list_draw_elapsed = timed(lambda: random.sample(list(entry_set), winners))
+    print(f"draw {winners}:  seeded draw {draw_elapsed * 1e6:.0f}us, copy to list + sample {list_draw_elapsed * 1e6:.0f}us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entrants", type=int, default=100_000)
+    parser.add_argument("--winners", type=int, default=10)
+    parser.add_argument("--list-limit", type=int, default=20_000, help="clicks to time against the plain list")
+    args = parser.parse_args()
+    run(args.entrants, args.winners, args.list_limit)
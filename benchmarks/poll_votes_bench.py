@@ -0,0 +1,66 @@
+"""Poll voting: the old per-option voter lists against VoteTally.
+
+Run from the repository root:
+
+    python -m benchmarks.poll_votes_bench --voters 50000
+"""
+import argparse
+import random
+import time
+
+from utils.poll_votes import VoteTally
+
+
+def vote_lists(votes: dict, options: list, user_id: int, option: str):
+    # What PollView.button_callback used to do on every click
+    for opt in options:
+        if user_id in votes[opt]:
+            votes[opt].remove(user_id)
+    votes[option].append(user_id)
+
+
+def run(voters: int, options: int, changes: float, list_limit: int):
+    rng = random.Random(0)
+    option_names = [f"Option {i + 1}" for i in range(options)]
+    user_ids = [rng.randrange(10 ** 17, 10 ** 19) for _ in range(voters)]
+    # Everyone votes once, then a share of them change their mind
+    clicks = [(user_id, rng.choice(option_names)) for user_id in user_ids]
+    clicks += [(user_id, rng.choice(option_names)) for user_id in rng.sample(user_ids, int(voters * changes))]
+
+    tally = VoteTally(option_names)
+    start = time.perf_counter()
+    for user_id, option in clicks:
+        tally.vote(user_id, option)
+    tally_elapsed = time.perf_counter() - start
+    print(f"VoteTally: {len(clicks):,} clicks in {tally_elapsed * 1000:.1f}ms "
+          f"({tally_elapsed / len(clicks) * 1e6:.2f}us per click)")
+
+    # The lists are quadratic, so only time a prefix of the clicks
+    list_clicks = clicks[:list_limit]
+    votes = {option: [] for option in option_names}
+    start = time.perf_counter()
+    for user_id, option in list_clicks:
+        vote_lists(votes, option_names, user_id, option)
+    list_elapsed = time.perf_counter() - start
+    print(f"lists:     {len(list_clicks):,} clicks in {list_elapsed * 1000:.1f}ms "
+          f"({list_elapsed / len(list_clicks) * 1e6:.2f}us per click, grows with every voter)")
+
+    start = time.perf_counter()
+    results = {option: tally.counts[option] for option in option_names}
+    counters_elapsed = time.perf_counter() - start
+    assert sum(results.values()) == tally.total == voters
+    expected = {option: 0 for option in option_names}
+    for option in tally.choices.values():
+        expected[option] += 1
+    assert expected == results
+    print(f"results:   {counters_elapsed * 1e6:.1f}us from the counters for {tally.total:,} voters")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--voters", type=int, default=50_000)
+    parser.add_argument("--options", type=int, default=5)
+    parser.add_argument("--changes", type=float, default=0.2, help="share of voters who change their vote")
+    parser.add_argument("--list-limit", type=int, default=10_000, help="clicks to time against the old lists")
+    args = parser.parse_args()
+    run(args.voters, args.options, args.changes, args.list_limit)
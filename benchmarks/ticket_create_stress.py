@@ -0,0 +1,78 @@
+"""Hundreds of simultaneous ticket creations against one store.
+
+Every user fires several selections at once (double clicks, two tabs), and a
+share of channel creations fail and release their reservation. Afterwards the
+table must hold exactly one ticket per successful user, with distinct ids and
+no rows left without a channel.
+
+Run from the repository root:
+
+    python -m benchmarks.ticket_create_stress --users 300 --duplicates 4 --fail-rate 0.1
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from utils.ticket_store import TicketStore
+
+GUILD_ID = 1
+
+
+async def select_ticket(store: TicketStore, user_id: int, fail: bool):
+    ticket_id = await store.reserve_ticket(GUILD_ID, f"user-{user_id}", user_id, int(time.time()))
+    if ticket_id is None:
+        return None
+    # Yield like the real create_text_channel call would
+    await asyncio.sleep(0)
+    if fail:
+        await store.release_ticket(ticket_id)
+        return None
+    await store.set_ticket_channel(ticket_id, 10_000_000 + ticket_id)
+    return ticket_id
+
+
+async def run(users: int, duplicates: int, fail_rate: float, seed: int):
+    rng = random.Random(seed)
+    failing = {user_id for user_id in range(users) if rng.random() < fail_rate}
+    requests = [user_id for user_id in range(users) for _ in range(duplicates)]
+    rng.shuffle(requests)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = TicketStore(os.path.join(tmp, "stress.db"))
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(select_ticket(store, user_id, user_id in failing) for user_id in requests))
+        elapsed = time.perf_counter() - start
+
+        rows = await store.read("SELECT id, discord_id, ticket_channel FROM ticket", fetch_all=True)
+        plan = await store.read("EXPLAIN QUERY PLAN SELECT id FROM ticket WHERE guild_id=? AND discord_id=?", (GUILD_ID, 1), fetch_all=True)
+        store.close()
+
+    created = [ticket_id for ticket_id in results if ticket_id is not None]
+    assert len(created) == len(set(created)), "duplicate ticket ids handed out"
+    assert len(rows) == len(created), f"{len(rows)} rows for {len(created)} created tickets"
+    assert len({row[1] for row in rows}) == len(rows), "a user ended up with two tickets"
+    assert all(row[2] is not None for row in rows), "rows left without a channel"
+    assert {row[1] for row in rows} == set(range(users)) - failing, "wrong set of users got a ticket"
+
+    print(f"users={users} duplicates={duplicates} requests={len(requests)} failed_channels={len(failing)}")
+    print(f"created {len(created)} tickets, rejected {len(requests) - len(created)} requests in {elapsed:.2f}s "
+          f"({len(requests) / elapsed:,.0f} requests/s)")
+    print(f"creator lookup: {plan[0][-1]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--duplicates", type=int, default=4)
+    parser.add_argument("--fail-rate", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(run(args.users, args.duplicates, args.fail_rate, args.seed))
+
+
+if __name__ == "__main__":
+    main()
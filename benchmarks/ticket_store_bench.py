@@ -0,0 +1,83 @@
+"""Ticket store throughput under concurrent interactions.
+
+Run from the repository root:
+
+    python -m benchmarks.ticket_store_bench --users 500 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from utils.ticket_store import TicketStore
+
+GUILD_ID = 1
+
+
+async def measure_loop_lag(stop: asyncio.Event, samples: list):
+    # The point of the store is keeping the loop free, so track how late a
+    # 1 ms sleep wakes up while the benchmark runs.
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(0.001)
+        samples.append(loop.time() - start - 0.001)
+
+
+async def create_ticket(store: TicketStore, user_id: int, semaphore: asyncio.Semaphore):
+    async with semaphore:
+        ticket_id = await store.reserve_ticket(GUILD_ID, f"user-{user_id}", user_id, 1735732800)
+        if ticket_id is None:
+            return
+        await store.set_ticket_channel(ticket_id, 10_000_000 + user_id)
+
+
+async def close_ticket(store: TicketStore, user_id: int, semaphore: asyncio.Semaphore):
+    async with semaphore:
+        channel_id = 10_000_000 + user_id
+        if await store.get_creator_id(channel_id) is None:
+            return
+        await store.get_ticket_by_channel(channel_id)
+        await store.delete_ticket(channel_id)
+
+
+async def run(users: int, concurrency: int, readers: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = TicketStore(os.path.join(tmp, "bench.db"), readers=readers)
+        semaphore = asyncio.Semaphore(concurrency)
+        stop = asyncio.Event()
+        lag = []
+        lag_task = asyncio.create_task(measure_loop_lag(stop, lag))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(create_ticket(store, user_id, semaphore) for user_id in range(users)))
+        create_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await asyncio.gather(*(close_ticket(store, user_id, semaphore) for user_id in range(users)))
+        close_elapsed = time.perf_counter() - start
+
+        stop.set()
+        await lag_task
+        store.close()
+
+    print(f"readers={readers} concurrency={concurrency} users={users}")
+    print(f"creates: {users / create_elapsed:,.0f}/s ({create_elapsed:.2f}s)")
+    print(f"closes:  {users / close_elapsed:,.0f}/s ({close_elapsed:.2f}s)")
+    if lag:
+        lag.sort()
+        print(f"loop lag p50={lag[len(lag) // 2] * 1000:.2f}ms max={lag[-1] * 1000:.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(run(args.users, args.concurrency, args.readers))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,3 @@
-import requests
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands, Embed, Color, File, ui
@@ -893,4 +892,8 @@ class FunCommands(commands.Cog):
                 await interaction.followup.send(embed=embed, view=AnimalView("dog", self)) # Add the view
 
         except Exception as e:
-            await interaction.followup.send(f"An error occurred: {e}", ephemeral=True)
\ No newline at end of file
+            await interaction.followup.send(f"An error occurred: {e}", ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(FunCommands(bot))
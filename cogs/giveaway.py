@@ -4,11 +4,24 @@ from discord import app_commands
 import json
 import os
 import asyncio
-from datetime import datetime, timedelta
-import random
-from typing import Optional, List
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional, List
+
+from utils.giveaway_draw import SeededDraw, new_seed
+from utils.giveaway_entries import EntrySet
+from utils.journal import AppendLog, atomic_write_json
+from utils.message_counts import message_counter
+from utils.message_refresher import message_refresher, with_field
+from utils.scheduler import DeadlineScheduler
 
 GIVEAWAY_FILE = "giveaways.json"
+GIVEAWAY_LOG = "giveaways.log"
+# Log records between snapshots
+COMPACT_EVERY = 5000
+# Seconds an ended giveaway is kept for /reroll
+REROLL_WINDOW = 7 * 24 * 3600
+# Seconds before a draw that failed (e.g. Discord errors) is tried again
+RETRY_DELAY = 60
 REQUIRED_ROLE_ID = 1317607057687576696
 
 
@@ -29,6 +42,12 @@ class Giveaway:
         allowed_roles: Optional[List[int]] = None,
         excluded_roles: Optional[List[int]] = None,
         color: int = 0x2F3136,
+        entries: Optional[EntrySet] = None,
+        ended: bool = False,
+        draw_seed: Optional[str] = None,
+        draw_position: int = 0,
+        winner_ids: Optional[List[int]] = None,
+        draw_population: Optional[int] = None,
     ):
         self.message_id = message_id
         self.channel_id = channel_id
@@ -44,12 +63,127 @@ class Giveaway:
         self.allowed_roles = allowed_roles or []
         self.excluded_roles = excluded_roles or []
         self.color = color
-        self.entries = []
+        self.entries = entries if entries is not None else EntrySet()
+        # Set when the giveaway is drawn; kept so the draw can be audited and rerolled
+        self.ended = ended
+        self.draw_seed = draw_seed
+        self.draw_position = draw_position
+        self.winner_ids = winner_ids or []
+        # Entries counted when entry closed; the draw only ever covers this many
+        self.draw_population = draw_population
+        self._rules: Optional[GiveawayRules] = None
+
+    @property
+    def rules(self) -> "GiveawayRules":
+        if self._rules is None:
+            self._rules = GiveawayRules(self)
+        return self._rules
+
+    @property
+    def closed(self) -> bool:
+        """No more entries are taken once the draw has started."""
+        return self.draw_population is not None
+
+    @property
+    def deadline(self) -> float:
+        """end_time (naive UTC) as epoch seconds."""
+        return self.end_time.replace(tzinfo=timezone.utc).timestamp()
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Giveaway":
+        data = dict(data, end_time=datetime.fromisoformat(data["end_time"]))
+        if "entries" in data:
+            data["entries"] = EntrySet.unpack(data["entries"])
+        return cls(**data)
+
+    def to_dict(self) -> dict:
+        return {
+            "message_id": self.message_id,
+            "channel_id": self.channel_id,
+            "guild_id": self.guild_id,
+            "prize": self.prize,
+            "description": self.description,
+            "winners": self.winners,
+            "end_time": self.end_time.isoformat(),
+            "host_id": self.host_id,
+            "required_role_id": self.required_role_id,
+            "min_account_age": self.min_account_age,
+            "min_messages": self.min_messages,
+            "allowed_roles": self.allowed_roles,
+            "excluded_roles": self.excluded_roles,
+            "color": self.color,
+            "entries": self.entries.pack(),
+            "ended": self.ended,
+            "draw_seed": self.draw_seed,
+            "draw_position": self.draw_position,
+            "winner_ids": self.winner_ids,
+            "draw_population": self.draw_population,
+        }
+
+
+def member_role_ids(member: discord.abc.User):
+    # Member._roles is discord.py's own array of role IDs; member.roles would
+    # build and sort Role objects on every click. Users outside a guild have none.
+    return getattr(member, "_roles", ())
+
+
+class GiveawayRules:
+    """A giveaway's entry requirements, compiled once into frozensets.
+
+    ``check`` makes a single pass over the member's role IDs, and skips it
+    entirely when the giveaway has no role rules.
+    """
+
+    __slots__ = ("required_role_id", "allowed", "excluded", "min_account_age", "min_messages", "has_role_rules")
+
+    def __init__(self, giveaway: "Giveaway"):
+        self.required_role_id = giveaway.required_role_id
+        self.allowed = frozenset(giveaway.allowed_roles)
+        self.excluded = frozenset(giveaway.excluded_roles)
+        self.min_account_age = timedelta(days=giveaway.min_account_age) if giveaway.min_account_age else None
+        self.min_messages = giveaway.min_messages or 0
+        self.has_role_rules = bool(self.required_role_id or self.allowed or self.excluded)
+
+    def check(self, member: discord.abc.User, guild_id: int) -> Optional[str]:
+        """Why ``member`` can't enter, or None if they can."""
+        has_required = not self.required_role_id
+        has_allowed = not self.allowed
+        is_excluded = False
+        if self.has_role_rules:
+            for role_id in member_role_ids(member):
+                if role_id == self.required_role_id:
+                    has_required = True
+                if role_id in self.allowed:
+                    has_allowed = True
+                if role_id in self.excluded:
+                    is_excluded = True
+
+        if not has_required:
+            return "You need the required role!"
+        if self.min_account_age and discord.utils.utcnow() - member.created_at < self.min_account_age:
+            return "Your account is too new!"
+        if not has_allowed:
+            return "You're not allowed to enter!"
+        if is_excluded:
+            return "You're excluded from this giveaway."
+        if self.min_messages and message_counter.get(guild_id, member.id) < self.min_messages:
+            return f"You need at least {self.min_messages} messages in this server to enter!"
+        return None
 
 
 class GiveawayManager:
+    """Giveaways in memory, persisted as a snapshot in GIVEAWAY_FILE plus an append-only GIVEAWAY_LOG.
+
+    Entering, adding and removing each append one line to the log, so an
+    entry costs the same I/O whether a giveaway has ten entrants or twenty
+    thousand. Once COMPACT_EVERY records have piled up the log is folded into
+    a new snapshot off the event loop.
+    """
+
     def __init__(self):
         self.giveaways = {}
+        self.log = AppendLog(GIVEAWAY_LOG)
+        self._compaction: Optional[asyncio.Task] = None
         self.load_giveaways()
 
     def load_giveaways(self):
@@ -57,38 +191,91 @@ class GiveawayManager:
             with open(GIVEAWAY_FILE, "r") as f:
                 data = json.load(f)
                 for giveaway_id, giveaway_data in data.items():
-                    giveaway_data["end_time"] = datetime.fromisoformat(
-                        giveaway_data["end_time"]
-                    )
-                    self.giveaways[giveaway_id] = Giveaway(**giveaway_data)
+                    self.giveaways[giveaway_id] = Giveaway.from_dict(giveaway_data)
+
+        # Entries can be replayed twice if a crash hit mid-compaction; EntrySet.add ignores repeats
+        for record in self.log.replay():
+            op, giveaway_id = record["op"], record["id"]
+            if op == "enter":
+                if giveaway_id in self.giveaways:
+                    self.giveaways[giveaway_id].entries.add(record["user"])
+            elif op == "add":
+                self.giveaways[giveaway_id] = Giveaway.from_dict(record["giveaway"])
+            elif op == "close":
+                if giveaway_id in self.giveaways:
+                    self.giveaways[giveaway_id].draw_population = record["population"]
+            elif op == "draw":
+                if giveaway_id in self.giveaways:
+                    giveaway = self.giveaways[giveaway_id]
+                    giveaway.ended = True
+                    giveaway.draw_population = record["population"]
+                    giveaway.draw_seed = record["seed"]
+                    giveaway.draw_position = record["position"]
+                    giveaway.winner_ids = record["winners"]
+            elif op == "remove":
+                self.giveaways.pop(giveaway_id, None)
+        # Fold the log into the snapshot so appends never follow a torn line
+        if self.log.exists():
+            self.save_giveaways()
+
+    def _snapshot(self) -> dict:
+        return {giveaway_id: giveaway.to_dict() for giveaway_id, giveaway in self.giveaways.items()}
 
     def save_giveaways(self):
-        data = {
-            giveaway_id: {
-                "message_id": giveaway.message_id,
-                "channel_id": giveaway.channel_id,
-                "guild_id": giveaway.guild_id,
-                "prize": giveaway.prize,
-                "description": giveaway.description,
-                "winners": giveaway.winners,
-                "end_time": giveaway.end_time.isoformat(),
-                "host_id": giveaway.host_id,
-                "required_role_id": giveaway.required_role_id,
-                "min_account_age": giveaway.min_account_age,
-                "min_messages": giveaway.min_messages,
-                "allowed_roles": giveaway.allowed_roles,
-                "excluded_roles": giveaway.excluded_roles,
-                "color": giveaway.color,
-                "entries": giveaway.entries,
-            }
-            for giveaway_id, giveaway in self.giveaways.items()
-        }
-        with open(GIVEAWAY_FILE, "w") as f:
-            json.dump(data, f, indent=4)
+        """Write a full snapshot and clear the log, blocking. Used at startup and shutdown."""
+        self.log.rotate()
+        atomic_write_json(GIVEAWAY_FILE, self._snapshot())
+        self.log.discard_rotated()
+
+    async def compact(self):
+        # Copy the state on the loop, then serialize and fsync it in a thread
+        data = self._snapshot()
+        self.log.rotate()
+        await asyncio.to_thread(atomic_write_json, GIVEAWAY_FILE, data)
+        self.log.discard_rotated()
+
+    async def close(self):
+        """Wait for any compaction in flight, then write a final snapshot."""
+        if self._compaction is not None:
+            await asyncio.gather(self._compaction, return_exceptions=True)
+        self.save_giveaways()
+
+    def _record(self, record: dict):
+        self.log.append(record)
+        if self.log.records >= COMPACT_EVERY and (self._compaction is None or self._compaction.done()):
+            self._compaction = asyncio.create_task(self.compact())
 
     def add_giveaway(self, giveaway_id: str, giveaway: Giveaway):
         self.giveaways[giveaway_id] = giveaway
-        self.save_giveaways()
+        self._record({"op": "add", "id": giveaway_id, "giveaway": giveaway.to_dict()})
+
+    def add_entry(self, giveaway_id: str, user_id: int):
+        giveaway = self.giveaways.get(giveaway_id)
+        if giveaway is None or giveaway.closed or not giveaway.entries.add(user_id):
+            return
+        self._record({"op": "enter", "id": giveaway_id, "user": user_id})
+
+    def close_entries(self, giveaway_id: str):
+        """Stop taking entries and fix the population the draw is made over."""
+        giveaway = self.giveaways[giveaway_id]
+        if giveaway.closed:
+            return
+        giveaway.draw_population = len(giveaway.entries)
+        self._record({"op": "close", "id": giveaway_id, "population": giveaway.draw_population})
+
+    def record_draw(self, giveaway_id: str, winners: List[int]):
+        """Mark the giveaway drawn and add ``winners``; the seed and stream position were set by draw_winners."""
+        giveaway = self.giveaways[giveaway_id]
+        giveaway.ended = True
+        giveaway.winner_ids.extend(winners)
+        self._record({
+            "op": "draw",
+            "id": giveaway_id,
+            "seed": giveaway.draw_seed,
+            "population": giveaway.draw_population,
+            "position": giveaway.draw_position,
+            "winners": giveaway.winner_ids,
+        })
 
     def get_giveaway(self, giveaway_id: str) -> Optional[Giveaway]:
         return self.giveaways.get(giveaway_id)
@@ -96,114 +283,221 @@ class GiveawayManager:
     def remove_giveaway(self, giveaway_id: str):
         if giveaway_id in self.giveaways:
             del self.giveaways[giveaway_id]
-            self.save_giveaways()
+            self._record({"op": "remove", "id": giveaway_id})
 
 
 giveaway_manager = GiveawayManager()
 
 
-class GiveawayView(discord.ui.View):
-    def __init__(self, giveaway: Giveaway):
-        super().__init__(timeout=None)
-        self.giveaway = giveaway
+def refresh_entry_count(giveaway: Giveaway, message: discord.Message):
+    # Rebuilt from the message's own embed so everything but the count stays as posted
+    base = message.embeds[0] if message.embeds else discord.Embed(title="🎉 GIVEAWAY", color=giveaway.color)
 
-    @discord.ui.button(
-        label="Enter Giveaway",
-        style=discord.ButtonStyle.primary,
-        custom_id="enter_giveaway",
-    )
-    async def enter_giveaway(
-        self, interaction: discord.Interaction, button: discord.ui.Button
+    def render() -> Optional[dict]:
+        if giveaway.closed:
+            return None
+        return {"embed": with_field(base, "Entries", f"{len(giveaway.entries):,}")}
+
+    message_refresher.mark_dirty(giveaway.channel_id, giveaway.message_id, render)
+
+
+class GiveawayEntryButton(discord.ui.DynamicItem[discord.ui.Button], template=r"enter_giveaway"):
+    """The "Enter Giveaway" button on every giveaway message.
+
+    Registered once with ``bot.add_dynamic_items`` and routed by the clicked
+    message's ID, so nothing is kept per giveaway message and buttons posted
+    before a restart keep working.
+    """
+
+    def __init__(self):
+        super().__init__(
+            discord.ui.Button(
+                label="Enter Giveaway",
+                style=discord.ButtonStyle.primary,
+                custom_id="enter_giveaway",
+            )
+        )
+
+    @classmethod
+    async def from_custom_id(
+        cls, interaction: discord.Interaction, item: discord.ui.Button, match
     ):
-        if interaction.user.id in self.giveaway.entries:
+        return cls()
+
+    async def callback(self, interaction: discord.Interaction):
+        giveaway_id = str(interaction.message.id)
+        giveaway = giveaway_manager.get_giveaway(giveaway_id)
+        if giveaway is None or giveaway.closed or giveaway.ended:
             return await interaction.response.send_message(
-                "You have already entered!", ephemeral=True
+                "This giveaway has ended.", ephemeral=True
             )
 
-        if self.giveaway.required_role_id and not any(
-            role.id == self.giveaway.required_role_id for role in interaction.user.roles
-        ):
+        if interaction.user.id in giveaway.entries:
             return await interaction.response.send_message(
-                "You need the required role!", ephemeral=True
+                "You have already entered!", ephemeral=True
             )
 
-        if self.giveaway.min_account_age:
-            if (datetime.utcnow() - interaction.user.created_at).days < (
-                self.giveaway.min_account_age
-            ):
-                return await interaction.response.send_message(
-                    "Your account is too new!", ephemeral=True
-                )
-
-        if self.giveaway.allowed_roles:
-            if not any(
-                role.id in self.giveaway.allowed_roles for role in interaction.user.roles
-            ):
-                return await interaction.response.send_message(
-                    "You're not allowed to enter!", ephemeral=True
-                )
-
-        if self.giveaway.excluded_roles:
-            if any(
-                role.id in self.giveaway.excluded_roles for role in interaction.user.roles
-            ):
-                return await interaction.response.send_message(
-                    "You're excluded from this giveaway.", ephemeral=True
-                )
-
-        self.giveaway.entries.append(interaction.user.id)
-        giveaway_manager.save_giveaways()
+        reason = giveaway.rules.check(interaction.user, interaction.guild_id)
+        if reason:
+            return await interaction.response.send_message(reason, ephemeral=True)
+
+        giveaway_manager.add_entry(giveaway_id, interaction.user.id)
+        refresh_entry_count(giveaway, interaction.message)
         await interaction.response.send_message(
             "You've entered the giveaway! 🎉", ephemeral=True
         )
 
 
-async def check_giveaways(bot):
+class GiveawayView(discord.ui.View):
+    """The view a new giveaway is posted with; clicks are handled by GiveawayEntryButton."""
+
+    def __init__(self):
+        super().__init__(timeout=None)
+        self.add_item(GiveawayEntryButton())
+
+
+async def is_eligible(giveaway: Giveaway, guild: discord.Guild, user_id: int) -> bool:
+    """Whether an entrant can still win: still in the server and still passing the entry rules."""
+    member = guild.get_member(user_id)
+    if member is None:
+        try:
+            member = await guild.fetch_member(user_id)
+        except discord.NotFound:
+            return False
+    return giveaway.rules.check(member, guild.id) is None
+
+
+async def draw_winners(
+    giveaway: Giveaway, guild: discord.Guild, count: int, exclude: Iterable[int] = ()
+) -> List[int]:
+    """Draw up to ``count`` eligible winners, continuing the giveaway's seeded draw.
+
+    Candidates come off the seeded stream one batch at a time, just enough
+    to fill the remaining places, and each batch is checked concurrently, so
+    a six-figure entry list costs no more than the handful of people drawn.
+    """
+    if giveaway.draw_seed is None:
+        giveaway.draw_seed = new_seed()
+    # Entries are closed before the first draw, so every draw and audit replays over the same population
+    draw = SeededDraw(giveaway.draw_seed, giveaway.draw_population, giveaway.draw_position)
+    exclude = set(exclude)
+    winners: List[int] = []
+    while len(winners) < count:
+        batch = []
+        while len(batch) < count - len(winners):
+            index = draw.next()
+            if index is None:
+                break
+            user_id = giveaway.entries[index]
+            if user_id not in exclude:
+                batch.append(user_id)
+        if not batch:
+            break
+        eligible = await asyncio.gather(*(is_eligible(giveaway, guild, user_id) for user_id in batch))
+        winners.extend(user_id for user_id, ok in zip(batch, eligible) if ok)
+    giveaway.draw_position = draw.position
+    return winners
+
+
+async def end_giveaway(bot: commands.Bot, giveaway_id: str):
+    giveaway = giveaway_manager.get_giveaway(giveaway_id)
+    if giveaway is None:
+        return
+    # Channels aren't cached until the gateway is ready
     await bot.wait_until_ready()
-    while not bot.is_closed():
-        now = datetime.utcnow()
-        for giveaway_id, giveaway in list(giveaway_manager.giveaways.items()):
-            if now >= giveaway.end_time:
-                channel = bot.get_channel(giveaway.channel_id)
-                if channel:
-                    try:
-                        message = await channel.fetch_message(giveaway.message_id)
-                        if giveaway.entries:
-                            winners = random.sample(
-                                giveaway.entries,
-                                min(giveaway.winners, len(giveaway.entries)),
-                            )
-                            mentions = ", ".join(f"<@{uid}>" for uid in winners)
-                            embed = discord.Embed(
-                                title="🎉 Giveaway Ended!",
-                                description=f"Prize: **{giveaway.prize}**\nWinners: {mentions}",
-                                color=giveaway.color,
-                            )
-                            await message.edit(embed=embed, view=None)
-                            await channel.send(
-                                f"Congrats {mentions}! You won **{giveaway.prize}**!"
-                            )
-                        else:
-                            await message.edit(
-                                embed=discord.Embed(
-                                    title="🎉 Giveaway Ended!",
-                                    description="No entries received!",
-                                    color=giveaway.color,
-                                ),
-                                view=None,
-                            )
-                    except:
-                        pass
-                giveaway_manager.remove_giveaway(giveaway_id)
-        await asyncio.sleep(60)
+    # Before anything else awaits, so no click lands between the deadline and the draw
+    giveaway_manager.close_entries(giveaway_id)
+    channel = bot.get_channel(giveaway.channel_id)
+    # A live-count edit landing after this would put the entry embed back
+    await message_refresher.settle(giveaway.message_id)
+    if channel is None:
+        # The channel is gone, so there is nowhere to announce winners
+        giveaway_manager.record_draw(giveaway_id, [])
+        return
+    try:
+        message = await channel.fetch_message(giveaway.message_id)
+    except discord.NotFound:
+        print(f"Giveaway message {giveaway_id} was deleted; ending it without a draw.")
+        giveaway_manager.record_draw(giveaway_id, [])
+        return
+
+    # Any other error propagates and the scheduler retries the whole draw; rewinding
+    # keeps the stream position matching what the audit trail will show
+    position = giveaway.draw_position
+    try:
+        winners = await draw_winners(giveaway, channel.guild, giveaway.winners) if giveaway.entries else []
+        if winners:
+            mentions = ", ".join(f"<@{uid}>" for uid in winners)
+            embed = discord.Embed(
+                title="🎉 Giveaway Ended!",
+                description=f"Prize: **{giveaway.prize}**\nWinners: {mentions}",
+                color=giveaway.color,
+            )
+            embed.set_footer(text=f"Draw seed: {giveaway.draw_seed}")
+        else:
+            embed = discord.Embed(
+                title="🎉 Giveaway Ended!",
+                description="No eligible entries!" if giveaway.entries else "No entries received!",
+                color=giveaway.color,
+            )
+        await message.edit(embed=embed, view=None)
+    except Exception:
+        giveaway.draw_position = position
+        raise
+    giveaway_manager.record_draw(giveaway_id, winners)
+
+    if winners:
+        try:
+            await channel.send(f"Congrats {mentions}! You won **{giveaway.prize}**!")
+        except discord.HTTPException as e:
+            print(f"Could not announce the winners of giveaway {giveaway_id}: {e}")
 
 
 class GiveawayCog(commands.Cog):
+    # Draws check entrants against the member cache; without it every candidate is an API fetch
+    required_intents = ("members",)
+
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-
-    async def setup_hook(self):
-        self.bot.loop.create_task(check_giveaways(self.bot))
+        self.scheduler = DeadlineScheduler(self.end_giveaway, name="giveaway-scheduler", retry_delay=RETRY_DELAY)
+
+    async def cog_load(self):
+        # One handler for every giveaway message, including ones posted before a restart
+        self.bot.add_dynamic_items(GiveawayEntryButton)
+        for giveaway_id, giveaway in giveaway_manager.giveaways.items():
+            self.schedule(giveaway_id, giveaway)
+        self.scheduler.start()
+        message_counter.start()
+        message_refresher.start(self.bot)
+
+    async def cog_unload(self):
+        self.bot.remove_dynamic_items(GiveawayEntryButton)
+        self.scheduler.stop()
+        await giveaway_manager.close()
+        await message_counter.stop()
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        # Counted for the min_messages rule
+        if message.guild and not message.author.bot:
+            message_counter.record(message.guild.id, message.author.id)
+
+    def schedule(self, giveaway_id: str, giveaway: Giveaway):
+        # Ended giveaways stay around for rerolls until REROLL_WINDOW has passed
+        if giveaway.ended:
+            self.scheduler.schedule(giveaway_id, giveaway.deadline + REROLL_WINDOW)
+        else:
+            self.scheduler.schedule(giveaway_id, giveaway.deadline)
+
+    async def end_giveaway(self, giveaway_id: str):
+        giveaway = giveaway_manager.get_giveaway(giveaway_id)
+        if giveaway is None:
+            return
+        if giveaway.ended:
+            giveaway_manager.remove_giveaway(giveaway_id)
+            return
+        await end_giveaway(self.bot, giveaway_id)
+        self.schedule(giveaway_id, giveaway)
 
     @app_commands.command(
         name="setupgiveaway", description="Set the required role to manage giveaways"
@@ -245,7 +539,7 @@ class GiveawayCog(commands.Cog):
 
         try:
             hex_color = int(color.strip("#"), 16) if color else 0x2F3136
-        except:
+        except ValueError:
             return await interaction.response.send_message(
                 "Invalid color!", ephemeral=True
             )
@@ -271,33 +565,75 @@ class GiveawayCog(commands.Cog):
                 name="Required Role", value=required_role.mention, inline=True
             )
 
-        view = GiveawayView(
-            Giveaway(
-                message_id=0,
-                channel_id=channel.id,
-                guild_id=interaction.guild_id,
-                prize=prize,
-                description=description,
-                winners=winners,
-                end_time=end_time,
-                host_id=interaction.user.id,
-                required_role_id=required_role.id if required_role else None,
-                min_account_age=min_account_age,
-                min_messages=min_messages,
-                allowed_roles=allowed_ids,
-                excluded_roles=excluded_ids,
-                color=hex_color,
-            )
+        giveaway = Giveaway(
+            message_id=0,
+            channel_id=channel.id,
+            guild_id=interaction.guild_id,
+            prize=prize,
+            description=description,
+            winners=winners,
+            end_time=end_time,
+            host_id=interaction.user.id,
+            required_role_id=required_role.id if required_role else None,
+            min_account_age=min_account_age,
+            min_messages=min_messages,
+            allowed_roles=allowed_ids,
+            excluded_roles=excluded_ids,
+            color=hex_color,
         )
 
-        message = await channel.send(embed=embed, view=view)
-        view.giveaway.message_id = message.id
-        giveaway_manager.add_giveaway(str(message.id), view.giveaway)
+        message = await channel.send(embed=embed, view=GiveawayView())
+        giveaway.message_id = message.id
+        giveaway_manager.add_giveaway(str(message.id), giveaway)
+        self.schedule(str(message.id), giveaway)
 
         await interaction.response.send_message(
             f"Giveaway created in {channel.mention}", ephemeral=True
         )
 
+    @app_commands.command(name="reroll", description="Draw new winners for an ended giveaway")
+    @app_commands.describe(
+        message_id="Message ID of the ended giveaway",
+        winners="How many new winners to draw",
+    )
+    async def reroll(
+        self,
+        interaction: discord.Interaction,
+        message_id: str,
+        winners: app_commands.Range[int, 1, 50] = 1,
+    ):
+        if not any(role.id == REQUIRED_ROLE_ID for role in interaction.user.roles):
+            return await interaction.response.send_message(
+                "You can't use this!", ephemeral=True
+            )
+
+        giveaway = giveaway_manager.get_giveaway(message_id)
+        if giveaway is None or not giveaway.ended or giveaway.guild_id != interaction.guild_id:
+            return await interaction.response.send_message(
+                "No ended giveaway with that message ID. Giveaways can be rerolled for 7 days.",
+                ephemeral=True,
+            )
+
+        await interaction.response.defer(ephemeral=True)
+        # Previous winners are skipped; the draw continues from where the last one stopped
+        new_winners = await draw_winners(giveaway, interaction.guild, winners, exclude=giveaway.winner_ids)
+        giveaway_manager.record_draw(message_id, new_winners)
+        if not new_winners:
+            return await interaction.followup.send(
+                "No eligible entrants are left to draw.", ephemeral=True
+            )
+
+        mentions = ", ".join(f"<@{uid}>" for uid in new_winners)
+        channel = self.bot.get_channel(giveaway.channel_id)
+        if channel:
+            await channel.send(
+                f"🎉 Reroll! Congrats {mentions}! You won **{giveaway.prize}**!"
+            )
+        await interaction.followup.send(
+            f"Rerolled: {mentions} (seed `{giveaway.draw_seed}`, draw position {giveaway.draw_position})",
+            ephemeral=True,
+        )
+
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(GiveawayCog(bot))
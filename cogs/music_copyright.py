@@ -5,14 +5,14 @@ import json
 import os
 from typing import Optional, Dict, List, Any
 from dotenv import load_dotenv
-from yt_dlp import YoutubeDL
 import asyncio
-import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
-from googleapiclient.discovery import build
+import importlib
 import re
+import threading
 from datetime import datetime
 
+from utils.tracing import span
+
 # Load environment variables (ensure these are also in your .env file)
 # load_dotenv() # Consider loading dotenv once in main.py
 
@@ -21,16 +21,45 @@ SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
 SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
 
 
-# Initialize YouTube API client
-if YOUTUBE_API_KEY:
-    try:
-        youtube_client = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
-    except Exception as e:
-        print(f"Error initializing YouTube API client: {e}")
-        youtube_client = None
-else:
-    print("YOUTUBE_API_KEY not found in environment variables. YouTube commands will not work.")
-    youtube_client = None
+# yt_dlp, spotipy and the Google API client are slow to import, so they are
+# only imported the first time a command needs them.
+_youtube_client = None
+_youtube_client_loaded = False
+_youtube_client_lock = threading.Lock()
+_youtube_dl_class = None
+
+
+def load_youtube_client():
+    """The YouTube API client, created on first use (None if there is no API key). Blocking; for worker threads."""
+    global _youtube_client, _youtube_client_loaded
+    with _youtube_client_lock:
+        if not _youtube_client_loaded:
+            if YOUTUBE_API_KEY:
+                try:
+                    from googleapiclient.discovery import build
+                    _youtube_client = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
+                except Exception as e:
+                    print(f"Error initializing YouTube API client: {e}")
+            else:
+                print("YOUTUBE_API_KEY not found in environment variables. YouTube commands will not work.")
+            _youtube_client_loaded = True
+    return _youtube_client
+
+
+async def youtube_client():
+    """The YouTube API client; the first call imports and builds it off the event loop."""
+    if _youtube_client_loaded:
+        return _youtube_client
+    return await asyncio.to_thread(load_youtube_client)
+
+
+async def youtube_dl(options: dict):
+    """A ``yt_dlp.YoutubeDL`` for ``options``; the first call imports yt_dlp off the event loop."""
+    global _youtube_dl_class
+    if _youtube_dl_class is None:
+        module = await asyncio.to_thread(importlib.import_module, "yt_dlp")
+        _youtube_dl_class = module.YoutubeDL
+    return _youtube_dl_class(options)
 
 
 # Regex pattern for YouTube URLs (Keep if needed within this file's logic)
@@ -42,25 +71,38 @@ class MusicCopyrightCog(commands.Cog):
         self.bot = bot
         self.cache_file = 'video_cache.json'
 
-        # Initialize Spotify client credentials manager
-        try:
-            # Check if keys are available before initializing
-            if SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET:
-                self.spotify_client_credentials_manager = SpotifyClientCredentials(client_id=SPOTIFY_CLIENT_ID, client_secret=SPOTIFY_CLIENT_SECRET)
-                self.spotify = spotipy.Spotify(client_credentials_manager=self.spotify_client_credentials_manager)
-            else:
-                 print("Spotify client ID or secret not found in environment variables. Spotify commands will not work.")
-                 self.spotify = None
-
-        except Exception as e:
-             print(f"Error initializing Spotify client: {e}")
-             self.spotify = None
-
+        # The Spotify client is created the first time spotify_client() is awaited
+        self._spotify = None
+        self._spotify_loaded = False
+        self._spotify_lock = threading.Lock()
 
         # Load cached data from the file (if it exists)
         self.cached_info = self.load_cache()
 
 
+    def _load_spotify(self):
+        with self._spotify_lock:
+            if not self._spotify_loaded:
+                try:
+                    # Check if keys are available before initializing
+                    if SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET:
+                        import spotipy
+                        from spotipy.oauth2 import SpotifyClientCredentials
+                        self.spotify_client_credentials_manager = SpotifyClientCredentials(client_id=SPOTIFY_CLIENT_ID, client_secret=SPOTIFY_CLIENT_SECRET)
+                        self._spotify = spotipy.Spotify(client_credentials_manager=self.spotify_client_credentials_manager)
+                    else:
+                         print("Spotify client ID or secret not found in environment variables. Spotify commands will not work.")
+                except Exception as e:
+                     print(f"Error initializing Spotify client: {e}")
+                self._spotify_loaded = True
+        return self._spotify
+
+    async def spotify_client(self):
+        """The Spotify client (None without credentials); the first call imports spotipy off the event loop."""
+        if self._spotify_loaded:
+            return self._spotify
+        return await asyncio.to_thread(self._load_spotify)
+
     def load_cache(self):
         """Load the cached video info from a file."""
         try:
@@ -98,27 +140,34 @@ class MusicCopyrightCog(commands.Cog):
     @app_commands.command(name='checkcopyright', description='Check copyright status of a song by title or YouTube URL')
     @app_commands.describe(query="Song title or YouTube URL")
     async def check_copyright(self, interaction: discord.Interaction, query: str):
-        await interaction.response.defer() # Defer the interaction
+        with span("defer"):
+            await interaction.response.defer() # Defer the interaction
 
         try:
             if 'youtube.com' in query or 'youtu.be' in query:
-                info = await self.get_youtube_info(query)
+                with span("api"):
+                    info = await self.get_youtube_info(query)
                 if info:
                     embed, view = await self.create_youtube_embed(info)
-                    await interaction.followup.send(embed=embed, view=view)
+                    with span("send"):
+                        await interaction.followup.send(embed=embed, view=view)
                 else:
-                    await interaction.followup.send("❌ Couldn't fetch video information. Please make sure the URL is valid.")
+                    with span("send"):
+                        await interaction.followup.send("❌ Couldn't fetch video information. Please make sure the URL is valid.")
             else:
-                if not self.spotify:
+                if not await self.spotify_client():
                      await interaction.followup.send("Spotify service is not available.")
                      return
 
-                results = await self.search_spotify_info(query)
+                with span("api"):
+                    results = await self.search_spotify_info(query)
                 if results:
                     embed = await self.create_spotify_embed(results)
-                    await interaction.followup.send(embed=embed)
+                    with span("send"):
+                        await interaction.followup.send(embed=embed)
                 else:
-                    await interaction.followup.send("❌ No information found for this song on Spotify.")
+                    with span("send"):
+                        await interaction.followup.send("❌ No information found for this song on Spotify.")
         except Exception as e:
             error_msg = f"❌ An error occurred: {str(e)}"
             # More specific error handling if possible
@@ -152,7 +201,7 @@ class MusicCopyrightCog(commands.Cog):
             'cookiesfrom': 'cookies.txt' if os.path.exists('cookies.txt') else None # Use cookies if available
         }
 
-        with YoutubeDL(ydl_opts) as ydl:
+        with await youtube_dl(ydl_opts) as ydl:
             try:
                 # Use the bot's event loop with run_in_executor for blocking ydl call
                 info = await asyncio.get_event_loop().run_in_executor(None, lambda: ydl.extract_info(url, download=False))
@@ -195,15 +244,16 @@ class MusicCopyrightCog(commands.Cog):
 
     async def search_spotify_info(self, query: str) -> Optional[Dict[str, Any]]:
         """Search for song information using Spotify"""
-        if not self.spotify: return None
+        spotify = await self.spotify_client()
+        if not spotify: return None
         try:
             # Use run_in_executor for blocking spotipy calls
-            results = await asyncio.get_event_loop().run_in_executor(None, lambda: self.spotify.search(q=query, type='track', limit=1))
+            results = await asyncio.get_event_loop().run_in_executor(None, lambda: spotify.search(q=query, type='track', limit=1))
 
             if results and results['tracks']['items']:
                 track = results['tracks']['items'][0]
                 # Fetch album details separately for copyrights
-                album = await asyncio.get_event_loop().run_in_executor(None, lambda: self.spotify.album(track['album']['id']))
+                album = await asyncio.get_event_loop().run_in_executor(None, lambda: spotify.album(track['album']['id']))
 
                 copyrighted = True
                 copyright_text = 'No copyright information available'
@@ -281,7 +331,7 @@ class MusicCopyrightCog(commands.Cog):
         view.add_item(learn_copyright_button)
 
         # Add a button to fetch detailed video info if YouTube client is available and we have a valid URL
-        if youtube_client and info.get('url'):
+        if await youtube_client() and info.get('url'):
             match = re.search(YOUTUBE_URL_PATTERN, info['url'])
             if match:
                 video_id = match.group(1)
@@ -333,7 +383,7 @@ class MusicCopyrightCog(commands.Cog):
 
             # Add button to get channel stats if channel ID is available
             view = ui.View() # Create a new view for these buttons
-            if youtube_client and video_info.get('channel_id'):
+            if await youtube_client() and video_info.get('channel_id'):
                 channel_id = video_info['channel_id']
                 get_stats_button = ui.Button(label="Get Channel Stats", style=discord.ButtonStyle.primary, custom_id=f"get_channel_stats_{channel_id}")
                 # Pass the channel_id to the callback
@@ -358,7 +408,7 @@ class MusicCopyrightCog(commands.Cog):
 
     # This is a blocking helper method for fetching video details
     def get_video_info_blocking(self, video_url: str) -> Dict[str, Any]:
-        if not youtube_client:
+        if not load_youtube_client():
              raise Exception("YouTube API client is not initialized.")
 
         match = re.search(YOUTUBE_URL_PATTERN, video_url)
@@ -367,7 +417,7 @@ class MusicCopyrightCog(commands.Cog):
         video_id = match.group(1)
 
         try:
-            video_request = youtube_client.videos().list(
+            video_request = load_youtube_client().videos().list(
                 part="snippet,contentDetails,statistics",
                 id=video_id
             )
@@ -388,7 +438,7 @@ class MusicCopyrightCog(commands.Cog):
              raise Exception("Could not find channel ID for the video.")
 
         try:
-            channel_request = youtube_client.channels().list(
+            channel_request = load_youtube_client().channels().list(
                 part="snippet,statistics",
                 id=channel_id
             )
@@ -469,17 +519,19 @@ class MusicCopyrightCog(commands.Cog):
     @app_commands.command(name='youtubestats', description='Get detailed statistics for a YouTube channel.')
     @app_commands.describe(channel_id='The ID of the YouTube channel')
     async def youtube_stats(self, interaction: discord.Interaction, channel_id: str):
-        await interaction.response.defer() # Defer the interaction
+        with span("defer"):
+            await interaction.response.defer() # Defer the interaction
 
-        if not youtube_client:
+        if not await youtube_client():
              await interaction.followup.send("YouTube API client is not initialized. Please check the bot's configuration.")
              return
 
         try:
             # Use run_in_executor for the blocking calls
-            stats = await asyncio.get_event_loop().run_in_executor(None, lambda: self.get_channel_details_blocking(channel_id))
-            latest_video = await asyncio.get_event_loop().run_in_executor(None, lambda: self.get_latest_video_blocking(channel_id))
-            top_video = await asyncio.get_event_loop().run_in_executor(None, lambda: self.get_top_video_blocking(channel_id))
+            with span("api"):
+                stats = await asyncio.get_event_loop().run_in_executor(None, lambda: self.get_channel_details_blocking(channel_id))
+                latest_video = await asyncio.get_event_loop().run_in_executor(None, lambda: self.get_latest_video_blocking(channel_id))
+                top_video = await asyncio.get_event_loop().run_in_executor(None, lambda: self.get_top_video_blocking(channel_id))
 
             if stats:
                 embed = Embed(
@@ -515,10 +567,12 @@ class MusicCopyrightCog(commands.Cog):
                 learn_copyright_button = ui.Button(style=discord.ButtonStyle.link, label="Learn About Copyright", url="https://gappa-web.pages.dev/wiki/wiki")
                 view.add_item(learn_copyright_button)
 
-                await interaction.followup.send(embed=embed, view=view)
+                with span("send"):
+                    await interaction.followup.send(embed=embed, view=view)
 
             else:
-                await interaction.followup.send("Channel not found for the provided ID!")
+                with span("send"):
+                    await interaction.followup.send("Channel not found for the provided ID!")
 
         except Exception as e:
             error_message = f"An error occurred: {str(e)}"
@@ -529,9 +583,9 @@ class MusicCopyrightCog(commands.Cog):
 
     # These helper methods were blocking and need to be called within run_in_executor
     def get_channel_details_blocking(self, channel_id: str) -> Optional[Dict[str, Any]]:
-        if not youtube_client: return None
+        if not load_youtube_client(): return None
         try:
-            request = youtube_client.channels().list(
+            request = load_youtube_client().channels().list(
                 part="snippet,statistics,brandingSettings,contentDetails",
                 id=channel_id
             )
@@ -560,9 +614,9 @@ class MusicCopyrightCog(commands.Cog):
              return None
 
     def get_latest_video_blocking(self, channel_id: str) -> Optional[Dict[str, Any]]:
-        if not youtube_client: return None
+        if not load_youtube_client(): return None
         try:
-            request = youtube_client.search().list(
+            request = load_youtube_client().search().list(
                 part="snippet",
                 channelId=channel_id,
                 order="date",
@@ -586,11 +640,11 @@ class MusicCopyrightCog(commands.Cog):
 
 
     def get_top_video_blocking(self, channel_id: str) -> Optional[Dict[str, Any]]:
-        if not youtube_client: return None
+        if not load_youtube_client(): return None
         try:
             # The YouTube Data API does not have a direct "order by viewCount" for search results
             # This search order is approximate and might not find the absolute top video.
-            request = youtube_client.search().list(
+            request = load_youtube_client().search().list(
                 part="snippet",
                 channelId=channel_id,
                 order="viewCount", # This might not work as expected for general search
@@ -617,7 +671,7 @@ class MusicCopyrightCog(commands.Cog):
     async def getid(self, interaction: discord.Interaction, query: str):
         await interaction.response.defer() # Defer the interaction
 
-        if not youtube_client:
+        if not await youtube_client():
              await interaction.followup.send("YouTube API client is not initialized. Please check the bot's configuration.")
              return
 
@@ -630,7 +684,7 @@ class MusicCopyrightCog(commands.Cog):
 
             # First, try to fetch by handle (more reliable if it's an exact handle)
             # Note: forHandle is the correct parameter for modern handles
-            request_handle = youtube_client.channels().list(
+            request_handle = (await youtube_client()).channels().list(
                 part="id,snippet",
                 forHandle=handle
             )
@@ -641,7 +695,7 @@ class MusicCopyrightCog(commands.Cog):
                 channel_name = response_handle["items"][0].get("snippet", {}).get("title")
             else:
                 # If not found by handle, try searching
-                search_request = youtube_client.search().list(
+                search_request = (await youtube_client()).search().list(
                     part="id,snippet",
                     q=query, # Use the original query for search
                     type="channel",
@@ -690,15 +744,16 @@ class MusicCopyrightCog(commands.Cog):
     async def get_channel_stats_button_callback(self, interaction: discord.Interaction, channel_id: str):
         await interaction.response.defer(ephemeral=True) # Defer ephemerally
 
-        if not youtube_client:
+        if not await youtube_client():
              await interaction.followup.send("YouTube API client is not initialized. Please check the bot's configuration.")
              return
 
         try:
             # Use run_in_executor for the blocking calls
-            stats = await asyncio.get_event_loop().run_in_executor(None, lambda: self.get_channel_details_blocking(channel_id))
-            latest_video = await asyncio.get_event_loop().run_in_executor(None, lambda: self.get_latest_video_blocking(channel_id))
-            top_video = await asyncio.get_event_loop().run_in_executor(None, lambda: self.get_top_video_blocking(channel_id))
+            with span("api"):
+                stats = await asyncio.get_event_loop().run_in_executor(None, lambda: self.get_channel_details_blocking(channel_id))
+                latest_video = await asyncio.get_event_loop().run_in_executor(None, lambda: self.get_latest_video_blocking(channel_id))
+                top_video = await asyncio.get_event_loop().run_in_executor(None, lambda: self.get_top_video_blocking(channel_id))
 
 
             if stats:
@@ -837,7 +892,7 @@ class MusicCopyrightCog(commands.Cog):
                 }],
                  'cookiesfrom': 'cookies.txt' if os.path.exists('cookies.txt') else None # Use cookies if available
             }
-            with YoutubeDL(ydl_opts) as ydl:
+            with await youtube_dl(ydl_opts) as ydl:
                 info = await asyncio.get_event_loop().run_in_executor(None, lambda: ydl.extract_info(url, download=True))
                 if not info:
                      await interaction.followup.send("Could not extract video information.")
@@ -0,0 +1,75 @@
+import asyncio
+
+import discord
+from discord import app_commands, Embed, Color
+from discord.ext import commands
+
+from utils.metrics import loop_lag
+from utils.perf import slow_callbacks
+from utils.tracing import TRACE_DUMP_PATH, tracer
+
+
+class PerfCog(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        loop_lag.start()
+        slow_callbacks.start(self.bot)
+
+    async def cog_unload(self):
+        slow_callbacks.stop()
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # Commands from every cog are registered by now
+        slow_callbacks.reset_callbacks()
+
+    @app_commands.command(name="perf", description="Show event loop lag and recent slow callbacks")
+    @app_commands.default_permissions(administrator=True)
+    async def perf(self, interaction: discord.Interaction):
+        lag = loop_lag.histogram
+        embed = Embed(title="Performance", color=Color.purple())
+        embed.add_field(name="Loop Lag (now)", value=f"{loop_lag.lag * 1000:.1f}ms", inline=True)
+        embed.add_field(name="Loop Lag (max)", value=f"{loop_lag.max_lag * 1000:.1f}ms", inline=True)
+        embed.add_field(name="Loop Lag p95/p99", value=f"≤{lag.quantile(0.95) * 1000:.0f}ms / ≤{lag.quantile(0.99) * 1000:.0f}ms", inline=True)
+        embed.add_field(name="Gateway Latency", value=f"{self.bot.latency * 1000:.0f}ms", inline=True)
+        embed.add_field(name="Slow Callbacks", value=f"{slow_callbacks.total} over {slow_callbacks.threshold * 1000:.0f}ms", inline=True)
+
+        recent = sorted(slow_callbacks.recent, key=lambda slow: slow.at, reverse=True)[:10]
+        if recent:
+            lines = [
+                f"<t:{int(slow.at)}:R> **{slow.duration * 1000:.0f}ms** {slow.cog} {slow.command}\n`{slow.location}`"
+                for slow in recent
+            ]
+            embed.add_field(name="Most Recent", value="\n".join(lines)[:1024], inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="traces", description="Show per-command latency percentiles and which phase is slow")
+    @app_commands.describe(dump="Also append the buffered traces to the trace file for offline analysis")
+    @app_commands.default_permissions(administrator=True)
+    async def traces(self, interaction: discord.Interaction, dump: bool = False):
+        stats = tracer.stats()
+        embed = Embed(title="Command Latency", color=Color.purple())
+        if not stats:
+            embed.description = "No commands traced yet."
+        # Slowest commands first
+        for command, entry in sorted(stats.items(), key=lambda item: item[1]["p95"], reverse=True)[:25]:
+            phases = " ".join(
+                f"{phase} {values['p95'] * 1000:.0f}"
+                for phase, values in sorted(entry["phases"].items(), key=lambda item: item[1]["p95"], reverse=True)
+            )
+            embed.add_field(
+                name=f"{command} (n={entry['count']}, errors={entry['errors']})",
+                value=(f"p50 {entry['p50'] * 1000:.0f}ms · p95 {entry['p95'] * 1000:.0f}ms · p99 {entry['p99'] * 1000:.0f}ms\n"
+                       f"p95 by phase (ms): {phases}")[:1024],
+                inline=False
+            )
+        if dump:
+            written = await asyncio.to_thread(tracer.dump)
+            embed.set_footer(text=f"Wrote {written} traces to {TRACE_DUMP_PATH}")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(PerfCog(bot))
@@ -1,17 +1,35 @@
 import discord
 from discord import app_commands, Embed, Color
-from discord.ext import commands, tasks
+from discord.ext import commands
 import asyncio
 from datetime import datetime, timedelta
 import json
 import os
 from typing import List, Dict, Optional
 
+from utils.journal import AppendLog, GroupCommitLog, atomic_write_json
+from utils.message_refresher import message_refresher, with_field
+from utils.poll_votes import VoteTally
+from utils.scheduler import DeadlineScheduler
+from utils.tracing import span
+
 POLLS_FILE = "polls.json"
+POLLS_JOURNAL = "polls.journal"
+# Journal records between snapshots
+COMPACT_EVERY = 5000
 POLL_CHANNEL_ID= 1368282389608140822
 POLL_ROLE_ID=1368596260340240514
 REQUIRED_ROLE_ID=1317606142523998258
 
+with open("config.json", "r") as config_file:
+    config = json.load(config_file)
+
+# A journal batch is committed after this many seconds or this many votes, whichever comes first
+JOURNAL_INTERVAL = config.get("poll_journal_interval_ms", 50) / 1000
+JOURNAL_BATCH = config.get("poll_journal_batch", 500)
+# Seconds before a poll that failed to end is tried again
+RETRY_DELAY = 60
+
 class Poll:
     def __init__(
         self,
@@ -22,7 +40,7 @@ class Poll:
         options: List[str],
         end_time: datetime,
         creator_id: int,
-        votes: Optional[Dict[str, List[int]]] = None # Make votes optional for initial creation
+        tally: Optional[VoteTally] = None # Empty for a new poll
     ):
         self.message_id = message_id
         self.channel_id = channel_id
@@ -31,11 +49,46 @@ class Poll:
         self.options = options
         self.end_time = end_time
         self.creator_id = creator_id
-        self.votes: Dict[str, List[int]] = votes if votes is not None else {option: [] for option in options}
+        self.tally = tally if tally is not None else VoteTally(options)
+
+    @classmethod
+    def from_dict(cls, poll_data: dict) -> 'Poll':
+        poll_data = dict(poll_data, end_time=datetime.fromisoformat(poll_data['end_time']))
+        options = poll_data.get('options', [])
+        # Votes for options that no longer exist are dropped by VoteTally
+        if isinstance(poll_data.get('choices'), dict):
+            poll_data['tally'] = VoteTally.from_dict(options, poll_data.pop('choices'))
+        elif isinstance(poll_data.get('votes'), dict):
+            # Older saves kept a list of voters per option
+            poll_data['tally'] = VoteTally.from_votes(options, poll_data['votes'])
+        poll_data.pop('votes', None)
+        return cls(**poll_data)
+
+    def to_dict(self) -> dict:
+        return {
+            'message_id': self.message_id,
+            'channel_id': self.channel_id,
+            'title': self.title,
+            'description': self.description,
+            'options': self.options,
+            'end_time': self.end_time.isoformat(),
+            'creator_id': self.creator_id,
+            'choices': self.tally.to_dict()
+        }
 
 class PollManager:
+    """Polls in memory, persisted as a snapshot in POLLS_FILE plus a vote journal in POLLS_JOURNAL.
+
+    Votes, new polls and removals are queued on a write-behind journal that
+    group-commits them (one write and one fsync per batch), so voting never
+    waits on the disk. The journal is replayed over the snapshot on startup
+    and folded into a new snapshot every COMPACT_EVERY records.
+    """
+
     def __init__(self):
         self.polls = {}
+        self.journal = GroupCommitLog(AppendLog(POLLS_JOURNAL), JOURNAL_INTERVAL, JOURNAL_BATCH)
+        self._compaction: Optional[asyncio.Task] = None
         self.load_polls()
 
     def load_polls(self):
@@ -44,42 +97,63 @@ class PollManager:
                 try:
                     data = json.load(f)
                     for poll_id, poll_data in data.items():
-                        poll_data['end_time'] = datetime.fromisoformat(poll_data['end_time'])
-                        # Ensure votes dictionary is properly initialized if missing or incomplete
-                        if 'votes' not in poll_data or not isinstance(poll_data['votes'], dict):
-                             poll_data['votes'] = {option: [] for option in poll_data.get('options', [])}
-                        else:
-                             # Clean up votes for options that no longer exist or add missing ones
-                             valid_votes = {option: [] for option in poll_data.get('options', [])}
-                             for option, user_ids in poll_data['votes'].items():
-                                 if option in valid_votes:
-                                     valid_votes[option] = user_ids
-                             poll_data['votes'] = valid_votes
-
-                        self.polls[poll_id] = Poll(**poll_data)
+                        self.polls[poll_id] = Poll.from_dict(poll_data)
                 except json.JSONDecodeError:
                     self.polls = {}
 
+        # Replaying a record twice (a crash mid-compaction) lands on the same state
+        for record in self.journal.log.replay():
+            op, poll_id = record['op'], record['id']
+            if op == 'vote':
+                poll = self.polls.get(poll_id)
+                if poll is not None and record['option'] in poll.tally.counts:
+                    poll.tally.vote(record['user'], record['option'])
+            elif op == 'add':
+                self.polls[poll_id] = Poll.from_dict(record['poll'])
+            elif op == 'remove':
+                self.polls.pop(poll_id, None)
+        if self.journal.log.exists():
+            self.save_polls()
+
+    def _snapshot(self) -> dict:
+        return {poll_id: poll.to_dict() for poll_id, poll in self.polls.items()}
+
     def save_polls(self):
-        data = {
-            str(poll.message_id): { # Use message_id as the key
-                'message_id': poll.message_id,
-                'channel_id': poll.channel_id,
-                'title': poll.title,
-                'description': poll.description,
-                'options': poll.options,
-                'end_time': poll.end_time.isoformat(),
-                'creator_id': poll.creator_id,
-                'votes': poll.votes
-            }
-            for poll in self.polls.values() # Iterate over values as message_id is the key
-        }
-        with open(POLLS_FILE, 'w') as f:
-            json.dump(data, f, indent=4)
+        """Write a full snapshot and clear the journal, blocking. Used at startup and shutdown."""
+        self.journal.log.rotate()
+        atomic_write_json(POLLS_FILE, self._snapshot())
+        self.journal.log.discard_rotated()
+
+    async def compact(self):
+        await self.journal.rotate()
+        # Taken right after the rotation, so every record in the rotated journal is in it
+        data = self._snapshot()
+        await asyncio.to_thread(atomic_write_json, POLLS_FILE, data)
+        self.journal.log.discard_rotated()
+
+    async def close(self):
+        """Flush the journal, wait for any compaction in flight, then write a final snapshot."""
+        await self.journal.close()
+        if self._compaction is not None:
+            await asyncio.gather(self._compaction, return_exceptions=True)
+        self.save_polls()
+
+    def _record(self, record: dict):
+        self.journal.append(record)
+        if self.journal.records >= COMPACT_EVERY and (self._compaction is None or self._compaction.done()):
+            self._compaction = asyncio.create_task(self.compact())
 
     def add_poll(self, poll: Poll):
-        self.polls[str(poll.message_id)] = poll # Use message_id as the key
-        self.save_polls()
+        poll_id = str(poll.message_id) # Use message_id as the key
+        self.polls[poll_id] = poll
+        self._record({'op': 'add', 'id': poll_id, 'poll': poll.to_dict()})
+
+    def record_vote(self, poll: Poll, user_id: int, option: str) -> Optional[str]:
+        """Cast or change ``user_id``'s vote and journal it; returns their previous option."""
+        previous = poll.tally.vote(user_id, option)
+        if previous != option:
+            self._record({'op': 'vote', 'id': str(poll.message_id), 'user': user_id, 'option': option})
+        return previous
 
     def get_poll(self, message_id: int) -> Optional[Poll]:
         return self.polls.get(str(message_id)) # Look up by message_id string
@@ -87,7 +161,7 @@ class PollManager:
     def remove_poll(self, message_id: int):
         if str(message_id) in self.polls:
             del self.polls[str(message_id)]
-            self.save_polls()
+            self._record({'op': 'remove', 'id': str(message_id)})
 
 poll_manager = PollManager()
 
@@ -104,6 +178,20 @@ class PollView(discord.ui.View):
             button.callback = self.button_callback
             self.add_item(button)
 
+    def refresh_tally(self, message: discord.Message):
+        # Rebuilt from the message's own embed so everything but the tally stays as posted
+        message_id = self.poll.message_id
+        base = message.embeds[0] if message.embeds else Embed(title=f"📊 {self.poll.title}", color=Color.purple())
+
+        def render() -> Optional[dict]:
+            poll = poll_manager.get_poll(message_id)
+            if poll is None:
+                return None
+            tally = "\n".join(f"{option}: {poll.tally.counts[option]}" for option in poll.options)
+            return {"embed": with_field(base, "Votes", tally)}
+
+        message_refresher.mark_dirty(message.channel.id, message_id, render)
+
     async def button_callback(self, interaction: discord.Interaction):
         # Extract message_id and option from custom_id
         parts = interaction.data['custom_id'].split('_')
@@ -119,15 +207,11 @@ class PollView(discord.ui.View):
              await interaction.response.send_message("This poll has already ended.", ephemeral=True)
              return
 
-        # Remove user's previous votes
-        for opt in poll.options:
-            if interaction.user.id in poll.votes[opt]:
-                poll.votes[opt].remove(interaction.user.id)
-
-        # Add new vote
-        if option in poll.votes:
-            poll.votes[option].append(interaction.user.id)
-            poll_manager.save_polls()
+        # Replaces the user's previous vote, if any
+        if option in poll.tally.counts:
+            previous = poll_manager.record_vote(poll, interaction.user.id, option)
+            if previous != option:
+                self.refresh_tally(interaction.message)
 
             await interaction.response.send_message(
                 f"You voted for: {option}",
@@ -139,6 +223,8 @@ class PollView(discord.ui.View):
 
 # You can keep this outside the cog or integrate it as a task method
 async def end_poll(bot: commands.Bot, poll: Poll):
+    # A live-tally edit landing after this would put the voting embed back
+    await message_refresher.settle(poll.message_id)
     channel = bot.get_channel(poll.channel_id)
     if not channel:
         poll_manager.remove_poll(poll.message_id)
@@ -148,12 +234,12 @@ async def end_poll(bot: commands.Bot, poll: Poll):
         message = await channel.fetch_message(poll.message_id)
 
         # Calculate results
-        total_votes = sum(len(votes) for votes in poll.votes.values())
+        total_votes = poll.tally.total
         results = []
 
-        for option, votes in poll.votes.items():
-            percentage = (len(votes) / total_votes * 100) if total_votes > 0 else 0
-            results.append(f"{option}: {len(votes)} votes ({percentage:.1f}%)")
+        for option, votes in poll.tally.counts.items():
+            percentage = (votes / total_votes * 100) if total_votes > 0 else 0
+            results.append(f"{option}: {votes} votes ({percentage:.1f}%)")
 
         embed = Embed(
             title=f"📊 Poll Results: {poll.title}",
@@ -184,11 +270,19 @@ async def end_poll(bot: commands.Bot, poll: Poll):
 class PollCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.check_ending_polls.start()
+        self.scheduler = DeadlineScheduler(self.end_poll, name="poll-scheduler", retry_delay=RETRY_DELAY)
         self.load_config() # Load configuration on cog initialization
 
-    def cog_unload(self):
-        self.check_ending_polls.cancel()
+    async def cog_load(self):
+        for poll in poll_manager.polls.values():
+            self.scheduler.schedule(poll.message_id, poll.end_time.timestamp()) # end_time is naive local time
+        self.scheduler.start()
+        message_refresher.start(self.bot)
+        poll_manager.journal.start()
+
+    async def cog_unload(self):
+        self.scheduler.stop()
+        await poll_manager.close()
 
     def load_config(self):
         global POLL_CHANNEL_ID, POLL_ROLE_ID, REQUIRED_ROLE_ID
@@ -314,13 +408,15 @@ class PollCog(commands.Cog):
                  notification_message = f"{notification_role.mention} New poll!"
 
         # Defer the interaction before sending the message
-        await interaction.response.defer()
-
-        message = await channel.send(
-            notification_message,
-            embed=embed,
-            view=view
-        )
+        with span("defer"):
+            await interaction.response.defer()
+
+        with span("send"):
+            message = await channel.send(
+                notification_message,
+                embed=embed,
+                view=view
+            )
 
         # Now that the message is sent, update the message_id and add to poll_manager
         poll = Poll(
@@ -330,15 +426,17 @@ class PollCog(commands.Cog):
             description=description,
             options=option_list,
             end_time=end_time,
-            creator_id=interaction.user.id,
-            votes={option: [] for option in option_list} # Initialize votes
+            creator_id=interaction.user.id
         )
-        poll_manager.add_poll(poll)
+        with span("db"):
+            poll_manager.add_poll(poll)
+        self.scheduler.schedule(poll.message_id, end_time.timestamp())
 
-        await interaction.followup.send(
-            f"Poll created in {channel.mention}!",
-            ephemeral=True
-        )
+        with span("send"):
+            await interaction.followup.send(
+                f"Poll created in {channel.mention}!",
+                ephemeral=True
+            )
 
     @app_commands.command(name="setuppoll", description="Setup the poll system")
     @app_commands.default_permissions(administrator=True)
@@ -379,13 +477,13 @@ class PollCog(commands.Cog):
 
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
-    @tasks.loop(seconds=60)
-    async def check_ending_polls(self):
-        now = datetime.now()
-        # Iterate over a copy of the polls dictionary to avoid issues during removal
-        for poll_id, poll in list(poll_manager.polls.items()):
-            if now >= poll.end_time:
-                await end_poll(self.bot, poll)
+    async def end_poll(self, message_id: int):
+        poll = poll_manager.get_poll(message_id)
+        if poll is None:
+            return
+        # Polls whose channel isn't cached yet would be dropped; with sharding this waits for every shard
+        await self.bot.wait_until_ready()
+        await end_poll(self.bot, poll)
 
 
 async def setup(bot: commands.Bot):
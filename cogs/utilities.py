@@ -7,6 +7,8 @@ from typing import Optional, Dict, List, Any
 from dotenv import load_dotenv # Keep dotenv here for config loading
 import asyncio # Import asyncio
 
+from utils.tracing import span
+
 
 # Load environment variables specific to utilities if needed (or keep it in main)
 # load_dotenv()
@@ -363,13 +365,15 @@ class Utilities(commands.Cog):
 
     @app_commands.command(name="help", description="Get a list of all available commands.")
     async def help(self, interaction: discord.Interaction):
-        await interaction.response.defer() # Defer the interaction as command loading can take time
+        with span("defer"):
+            await interaction.response.defer() # Defer the interaction as command loading can take time
 
         try:
             # Ensure commands are categorized
             if not self.categorized_commands:
                 print("Categorized commands not populated, attempting categorization from help command.") # Debug print
-                await self.categorize_commands()
+                with span("categorize"):
+                    await self.categorize_commands()
             else:
                  print("Using cached categorized commands for help command.") # Debug print
 
@@ -421,7 +425,8 @@ class Utilities(commands.Cog):
             # Send the first embed with the paginator view
             view = HelpPaginatorView(embeds, 0)
             # The interaction was deferred, so use followup.send
-            view.message = await interaction.followup.send(embed=embeds[0], view=view)
+            with span("send"):
+                view.message = await interaction.followup.send(embed=embeds[0], view=view)
 
         except Exception as e:
             print(f"Error in help command: {e}")
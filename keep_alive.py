@@ -1,15 +1,103 @@
-from flask import Flask
-from threading import Thread
+import json
+import os
+import time
+from typing import Callable, Optional
 
-app = Flask('')
+import discord
+from aiohttp import web
+from discord.ext import commands
 
-@app.route('/')
-def home():
-    return "I'm alive!"
+from utils.metrics import counter, histogram, loop_lag, prometheus_text
+from utils.sharding import shard_metrics
 
-def run():
-    app.run(host='0.0.0.0', port=8080)
+with open("config.json", mode="r") as config_file:
+    config = json.load(config_file)
 
-def keep_alive():
-    t = Thread(target=run)
-    t.start()
+HEALTH_HOST = "0.0.0.0"
+HEALTH_PORT = int(os.getenv("PORT", config.get("health_port", 8080)))
+
+interaction_latency = histogram("interaction_seconds", "Time from an application command being invoked to it completing")
+command_counts = counter("app_command_total", "Completed application commands", "command")
+command_errors = counter("app_command_errors_total", "Application commands that raised", "command")
+
+
+class HealthServer:
+    """Liveness, readiness and metrics over HTTP, served from the bot's own event loop.
+
+    ``/`` and ``/healthz`` answer as long as the loop is running, ``/readyz``
+    only once the gateway is connected and every cog is loaded, and
+    ``/metrics`` is in Prometheus text format.
+    """
+
+    def __init__(self, bot: commands.Bot, cogs_loaded: Callable[[], bool]):
+        self.bot = bot
+        self.cogs_loaded = cogs_loaded
+        self.started = time.monotonic()
+        self._runner: Optional[web.AppRunner] = None
+
+        self.app = web.Application()
+        self.app.router.add_get("/", self.home)
+        self.app.router.add_get("/healthz", self.healthz)
+        self.app.router.add_get("/readyz", self.readyz)
+        self.app.router.add_get("/metrics", self.metrics)
+
+        bot.add_listener(self.on_app_command_completion)
+        bot.tree.error(self.on_app_command_error)
+
+    async def start(self, host: str = HEALTH_HOST, port: int = HEALTH_PORT):
+        loop_lag.start()
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        print(f"Health server listening on {host}:{port}")
+
+    async def stop(self):
+        loop_lag.stop()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        interaction_latency.observe((discord.utils.utcnow() - interaction.created_at).total_seconds())
+        command_counts.inc(command.qualified_name)
+
+    async def on_app_command_error(self, interaction: discord.Interaction, error: discord.app_commands.AppCommandError):
+        command = interaction.command
+        command_errors.inc(command.qualified_name if command else "unknown")
+        # Fall through to the tree class's own handler (tracing, then discord.py's default logging)
+        await type(self.bot.tree).on_error(self.bot.tree, interaction, error)
+
+    async def home(self, request: web.Request) -> web.Response:
+        return web.Response(text="I'm alive!")
+
+    async def healthz(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok", "uptime": round(time.monotonic() - self.started, 1)})
+
+    async def readyz(self, request: web.Request) -> web.Response:
+        checks = {
+            "gateway": self.bot.is_ready() and not self.bot.is_closed(),
+            "cogs": self.cogs_loaded(),
+        }
+        status = 200 if all(checks.values()) else 503
+        return web.json_response({"ready": status == 200, "checks": checks}, status=status)
+
+    async def metrics(self, request: web.Request) -> web.Response:
+        gauges = [
+            ("event_loop_lag_current_seconds", "Event loop lag at the last sample", {}, loop_lag.lag),
+            ("event_loop_lag_max_seconds", "Largest event loop lag since start", {}, loop_lag.max_lag),
+            ("bot_ready", "1 once the gateway connection is ready", {}, int(self.bot.is_ready())),
+            ("bot_guilds", "Guilds the bot is in", {}, len(self.bot.guilds)),
+        ]
+        for shard in shard_metrics.snapshot(self.bot):
+            labels = {"shard": str(shard["shard"])}
+            latency = shard["latency"]
+            gauges.append(("gateway_latency_seconds", "Heartbeat latency per shard", labels, latency if latency == latency else -1))
+            gauges.append(("gateway_events_per_second", "Guild events per second per shard over the last minute", labels, shard["events_per_second"]))
+        return web.Response(text=prometheus_text(gauges), content_type="text/plain", charset="utf-8")
+
+
+async def keep_alive(bot: commands.Bot, cogs_loaded: Callable[[], bool]) -> HealthServer:
+    """Start the health server on the running event loop and return it."""
+    server = HealthServer(bot, cogs_loaded)
+    await server.start()
+    return server
@@ -2,15 +2,10 @@ import discord
 import json
 from discord import *
 from discord.ext import commands, tasks
-from cogs.ticket_system import Ticket_System
-from cogs.ticket_commands import Ticket_Command
-from cogs.fun import FunCommands
-from cogs.utilities import Utilities
-from cogs.music_copyright import MusicCopyrightCog
-from cogs.giveaway import GiveawayCog
-from cogs.welcomer import WelcomeGoodbyeCog
-from cogs.poll import PollCog
 from keep_alive import keep_alive
+from utils.sharding import build_bot, shard_metrics
+from utils.intents import plan_intents, intent_stats, PREFIX_COMMAND_INTENTS
+from utils.cog_loader import CogLoader
 from dotenv import load_dotenv
 import os
 
@@ -23,43 +18,82 @@ GUILD_ID = config["guild_id"]
 CATEGORY_ID = config["category_id"]
 ROLE_ID = 1317607057687576696
 
-bot = commands.Bot(command_prefix="!", intents=discord.Intents.all())
+COGS = [
+    "cogs.ticket_system",
+    "cogs.ticket_commands",
+    "cogs.fun",
+    "cogs.utilities",
+    "cogs.music_copyright",
+    "cogs.giveaway",
+    "cogs.welcomer",
+    "cogs.poll",
+    "cogs.perf",
+]
+cog_loader = CogLoader(COGS)
+
+# Only the intents the loaded cogs need; set "minimal_intents": false to compare against Intents.all()
+if config.get("minimal_intents", True):
+    intents = plan_intents(cog_loader.import_all(), extra=PREFIX_COMMAND_INTENTS)
+else:
+    intents = discord.Intents.all()
+
+# A plain Bot unless "sharding" is enabled in config.json
+bot = build_bot(command_prefix="!", intents=intents)
+sync_manager = bot.sync_manager
 
 async def load_cogs():
-    await bot.add_cog(Ticket_System(bot))
-    await bot.add_cog(Ticket_Command(bot))
-    await bot.add_cog(FunCommands(bot))
-    await bot.add_cog(Utilities(bot))
-    await bot.add_cog(MusicCopyrightCog(bot))
-    await bot.add_cog(GiveawayCog(bot))
-    await bot.add_cog(WelcomeGoodbyeCog(bot))
-    await bot.add_cog(PollCog(bot))
+    # Safe to call more than once, every cog is set up a single time
+    await cog_loader.load(bot)
+
+# Cogs load inside bot.start() once logged in, so anything their cog_load starts
+# can wait_until_ready(); before login that raises and the task dies
+bot.setup_hook = load_cogs
 
 async def start_bot():
-    await load_cogs()
+    # Liveness/readiness/metrics endpoint, served from this event loop
+    await keep_alive(bot, cog_loader.all_loaded)
     await bot.start(BOT_TOKEN)
 
 @bot.event
 async def on_ready():
     print(f'Bot Started | {bot.user.name}')
-    await load_cogs()
-    await bot.tree.sync()
+    # on_ready fires again after every reconnect; cogs are loaded once in setup_hook and
+    # the tree is only pushed when it differs from the last sync
+    await sync_manager.sync()
     await bot.change_presence(activity=discord.Activity(type=discord.ActivityType.watching, name='you | /help'))
 
 @bot.command(name="sync")
-async def sync_command(ctx):
+async def sync_command(ctx, mode: str = ""):
     ROLE_ID = 1317607057687576696
 
     if any(role.id == ROLE_ID for role in ctx.author.roles):
-        synced = await bot.tree.sync(guild=discord.Object(id=GUILD_ID))
-        await ctx.send(f"✅ Synced {len(synced)} command(s) to this guild.")
-        print("Command tree synced.")
+        # "!sync force" pushes the tree even if it matches the last sync
+        report = await sync_manager.sync(guild=discord.Object(id=GUILD_ID), force=mode == "force")
+        await ctx.send(f"✅ {report}")
+    else:
+        await ctx.send("❌ You do not have permission to use this command.")
+
+@bot.command(name="shards")
+async def shards_command(ctx):
+    if any(role.id == ROLE_ID for role in ctx.author.roles):
+        lines = [
+            f"Shard {shard['shard']}: {shard['latency'] * 1000:.0f}ms, {shard['events_per_second']:.1f} events/s, "
+            f"{shard['connects']} connects, {shard['disconnects']} disconnects, {shard['resumes']} resumes"
+            for shard in shard_metrics.snapshot(bot)
+        ]
+        await ctx.send("\n".join(lines))
+    else:
+        await ctx.send("❌ You do not have permission to use this command.")
+
+@bot.command(name="intents")
+async def intents_command(ctx):
+    if any(role.id == ROLE_ID for role in ctx.author.roles):
+        await ctx.send("\n".join(intent_stats.report(bot)))
     else:
         await ctx.send("❌ You do not have permission to use this command.")
 
 
 def main():
-    keep_alive()
     try:
         import asyncio
         asyncio.run(start_bot())
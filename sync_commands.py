@@ -15,24 +15,23 @@ except Exception as e:
 class SyncCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # Shared with on_ready's sync; a second manager would overwrite its saved state with stale data
+        self.sync_manager = bot.sync_manager
 
     @commands.command(name="sync", help="Manually sync slash commands (Owner only)")
     @commands.is_owner()
-    async def sync(self, ctx):
-        """Manually sync application commands"""
+    async def sync(self, ctx, mode: str = ""):
+        """Manually sync application commands, skipping scopes that haven't changed ("force" syncs anyway)"""
         try:
             print(f"Manual sync triggered by {ctx.author}")
             guild = discord.Object(id=GUILD_ID)
-            
-            # First, try guild-specific sync
-            synced = await self.bot.tree.sync(guild=guild)
-            await ctx.send(f"✅ Synced {len(synced)} guild commands to {GUILD_ID}")
-            print(f"Synced {len(synced)} guild commands: {[cmd.name for cmd in synced]}")
-            
-            # Then try global sync
-            global_synced = await self.bot.tree.sync()
-            await ctx.send(f"✅ Synced {len(global_synced)} global commands")
-            print(f"Synced {len(global_synced)} global commands: {[cmd.name for cmd in global_synced]}")
+            force = mode == "force"
+
+            # First, the guild-specific commands
+            await ctx.send(f"✅ {await self.sync_manager.sync(guild=guild, force=force)}")
+
+            # Then the global commands
+            await ctx.send(f"✅ {await self.sync_manager.sync(force=force)}")
             
         except Exception as e:
             await ctx.send(f"❌ Error syncing commands: {e}")
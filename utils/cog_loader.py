@@ -0,0 +1,67 @@
+import asyncio
+import importlib
+import time
+from types import ModuleType
+from typing import Dict, Iterable, List, Optional
+
+from discord.ext import commands
+
+
+class CogLoader:
+    """Imports cog modules and runs their ``setup(bot)`` exactly once, timing both steps.
+
+    ``load`` can be called again (e.g. from a reconnect) and skips everything
+    that is already set up. Import times include any module a cog imports for
+    the first time, so a shared dependency is counted against the first cog
+    that pulls it in.
+    """
+
+    def __init__(self, modules: Iterable[str]):
+        self.modules = list(modules)
+        self.imported: Dict[str, ModuleType] = {}
+        self.import_times: Dict[str, float] = {}
+        self.setup_times: Dict[str, float] = {}
+        self._lock: Optional[asyncio.Lock] = None
+
+    def import_all(self) -> List[type]:
+        """Import every cog module and return the cog classes they define."""
+        for name in self.modules:
+            if name not in self.imported:
+                start = time.perf_counter()
+                self.imported[name] = importlib.import_module(name)
+                self.import_times[name] = time.perf_counter() - start
+        return self.cog_classes()
+
+    def all_loaded(self) -> bool:
+        return all(name in self.setup_times for name in self.modules)
+
+    def cog_classes(self) -> List[type]:
+        return [
+            value
+            for module in self.imported.values()
+            for value in vars(module).values()
+            if isinstance(value, type) and issubclass(value, commands.Cog) and value.__module__ == module.__name__
+        ]
+
+    async def load(self, bot: commands.Bot):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            pending = [name for name in self.modules if name not in self.setup_times]
+            if not pending:
+                return
+            self.import_all()
+            for name in pending:
+                start = time.perf_counter()
+                await self.imported[name].setup(bot)
+                self.setup_times[name] = time.perf_counter() - start
+            self.print_timings()
+
+    def print_timings(self):
+        print(f"{'Cog':<28}{'import':>10}{'setup':>10}")
+        for name in self.modules:
+            import_time = self.import_times.get(name, 0.0) * 1000
+            setup_time = self.setup_times.get(name, 0.0) * 1000
+            print(f"{name:<28}{import_time:>8.1f}ms{setup_time:>8.1f}ms")
+        total = (sum(self.import_times.values()) + sum(self.setup_times.values())) * 1000
+        print(f"{'total':<28}{total:>18.1f}ms")
@@ -0,0 +1,109 @@
+import asyncio
+import hashlib
+import json
+import os
+from typing import Dict, List, NamedTuple, Optional
+
+import discord
+from discord import app_commands
+
+SYNC_STATE_FILE = "command_sync.json"
+
+
+class SyncDiff(NamedTuple):
+    added: List[str]
+    removed: List[str]
+    changed: List[str]
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def describe(self) -> str:
+        parts = [f"+{name}" for name in self.added]
+        parts += [f"~{name}" for name in self.changed]
+        parts += [f"-{name}" for name in self.removed]
+        return " ".join(parts) or "no changes"
+
+
+def _digest(payload) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+class CommandSyncManager:
+    """Only pushes the app command tree to Discord when it actually changed.
+
+    The payload ``tree.sync`` would send for a scope (global, or one guild) is
+    hashed per command and compared with the hashes stored after the last
+    successful sync in ``command_sync.json``. Identical trees are skipped, so
+    restarts and reconnects don't spend the sync rate limit.
+    """
+
+    def __init__(self, tree: app_commands.CommandTree, path: str = SYNC_STATE_FILE):
+        self.tree = tree
+        self.path = path
+        self._state: Optional[dict] = None
+
+    @staticmethod
+    def _scope(guild: Optional[discord.abc.Snowflake]) -> str:
+        return "global" if guild is None else str(guild.id)
+
+    def _load_state(self) -> dict:
+        if self._state is None:
+            try:
+                with open(self.path, "r") as f:
+                    self._state = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._state = {}
+            # Hashes recorded for another application say nothing about this one
+            if self._state.get("application_id") != self.tree.client.application_id:
+                self._state = {"application_id": self.tree.client.application_id, "scopes": {}}
+        return self._state
+
+    def _save_state(self):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self._state, f)
+        os.replace(temp_path, self.path)
+
+    def local_hashes(self, guild: Optional[discord.abc.Snowflake] = None) -> Dict[str, str]:
+        """Hash of each command's sync payload in this scope, keyed by ``type:name``."""
+        hashes = {}
+        for command in self.tree.get_commands(guild=guild):
+            payload = command.to_dict(self.tree)
+            hashes[f"{payload.get('type', 1)}:{command.name}"] = _digest(payload)
+        return hashes
+
+    def diff(self, guild: Optional[discord.abc.Snowflake] = None) -> Optional[SyncDiff]:
+        """Changes since the last sync of this scope, or None if it was never synced from here."""
+        synced = self._load_state()["scopes"].get(self._scope(guild))
+        if synced is None:
+            return None
+        local = self.local_hashes(guild)
+        name = lambda key: key.split(":", 1)[1]
+        return SyncDiff(
+            added=sorted(name(key) for key in local.keys() - synced.keys()),
+            removed=sorted(name(key) for key in synced.keys() - local.keys()),
+            changed=sorted(name(key) for key in local.keys() & synced.keys() if local[key] != synced[key]),
+        )
+
+    async def sync(self, guild: Optional[discord.abc.Snowflake] = None, force: bool = False) -> str:
+        """Sync one scope if its commands changed and return a one-line report."""
+        scope = self._scope(guild)
+        diff = self.diff(guild)
+        if diff is not None and not diff and not force:
+            report = f"{scope}: unchanged, sync skipped"
+            print(report)
+            return report
+
+        synced = await self.tree.sync(guild=guild)
+        self._load_state()["scopes"][scope] = self.local_hashes(guild)
+        await asyncio.to_thread(self._save_state)
+
+        if diff is None:
+            report = f"{scope}: synced {len(synced)} command(s) (no previous sync recorded)"
+        elif force and not diff:
+            report = f"{scope}: synced {len(synced)} command(s) (forced, no changes)"
+        else:
+            report = f"{scope}: synced {len(synced)} command(s): {diff.describe()}"
+        print(report)
+        return report
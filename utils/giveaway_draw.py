@@ -0,0 +1,58 @@
+import hashlib
+import secrets
+from typing import Dict, Iterator, Optional
+
+
+def new_seed() -> str:
+    return secrets.token_hex(32)
+
+
+class SeededDraw:
+    """Reproducible draw without replacement over positions ``0..population-1``.
+
+    Randomness comes from SHA-256 of the seed and a counter, so anyone with
+    the seed and the entry list can replay a draw and check the winners. The
+    shuffle is a Fisher-Yates that stores only the swapped slots, so drawing
+    k positions costs O(k) time and memory whatever the population. Passing
+    ``position`` replays the first draws to continue where an earlier draw
+    stopped, which is how rerolls pick up after the original winners.
+    """
+
+    def __init__(self, seed: str, population: int, position: int = 0):
+        self.seed = bytes.fromhex(seed)
+        self.population = population
+        self.position = 0
+        self._counter = 0
+        self._swaps: Dict[int, int] = {}
+        for _ in range(min(position, population)):
+            self.next()
+
+    def _below(self, n: int) -> int:
+        # Rejection sampling on the top bits keeps every value equally likely
+        bits = n.bit_length()
+        while True:
+            digest = hashlib.sha256(self.seed + self._counter.to_bytes(8, "big")).digest()
+            self._counter += 1
+            value = int.from_bytes(digest[:8], "big") >> (64 - bits)
+            if value < n:
+                return value
+
+    def next(self) -> Optional[int]:
+        """The next drawn position, or None once every position has been drawn."""
+        if self.position >= self.population:
+            return None
+        i = self.position
+        j = i + self._below(self.population - i)
+        drawn = self._swaps.get(j, j)
+        current = self._swaps.pop(i, i)
+        if j != i:
+            self._swaps[j] = current
+        self.position += 1
+        return drawn
+
+    def __iter__(self) -> Iterator[int]:
+        while True:
+            drawn = self.next()
+            if drawn is None:
+                return
+            yield drawn
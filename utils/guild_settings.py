@@ -0,0 +1,87 @@
+import json
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from utils.ticket_store import ticket_store
+
+with open("config.json", mode="r") as config_file:
+    config = json.load(config_file)
+
+# Guilds without their own settings use these for the text fields
+DEFAULT_TIMEZONE = config["timezone"]
+DEFAULT_EMBED_TITLE = config["embed_title"]
+DEFAULT_EMBED_DESCRIPTION = config["embed_description"]
+
+
+class TicketSettings(NamedTuple):
+    guild_id: int
+    ticket_channel_id: Optional[int] = None
+    category_id: Optional[int] = None
+    team_role_id: Optional[int] = None
+    log_channel_id: Optional[int] = None
+    timezone: str = DEFAULT_TIMEZONE
+    embed_title: str = DEFAULT_EMBED_TITLE
+    embed_description: str = DEFAULT_EMBED_DESCRIPTION
+
+
+SETTING_FIELDS = TicketSettings._fields[1:]
+
+
+class GuildSettingsStore:
+    """Ticket settings for every guild, kept in memory and written through to the database.
+
+    ``get`` is a dict lookup, so interaction handlers can call it on every press.
+    Changes made with ``update`` apply immediately and are passed to every
+    listener as ``(old, new)``. On first start the values in config.json become
+    the settings of its ``guild_id``, so existing single-guild setups keep working.
+    """
+
+    def __init__(self):
+        self._cache: Dict[int, TicketSettings] = {}
+        self._listeners: List[Callable[[TicketSettings, TicketSettings], Awaitable[None]]] = []
+
+    async def warm(self):
+        self._cache = {row[0]: TicketSettings(*row) for row in await ticket_store.guild_settings()}
+        guild_id = config["guild_id"]
+        if guild_id not in self._cache:
+            settings = TicketSettings(
+                guild_id,
+                config["ticket_channel_id"],
+                config["category_id"],
+                config["team_role_id"],
+                config["log_channel_id"],
+            )
+            await ticket_store.save_guild_settings(settings)
+            self._cache[guild_id] = settings
+
+    def get(self, guild_id: int) -> TicketSettings:
+        """Settings for ``guild_id``; a guild that was never set up gets defaults with no channels or roles."""
+        settings = self._cache.get(guild_id)
+        return settings if settings is not None else TicketSettings(guild_id)
+
+    def add_listener(self, listener: Callable[[TicketSettings, TicketSettings], Awaitable[None]]):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[TicketSettings, TicketSettings], Awaitable[None]]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    async def update(self, guild_id: int, **changes) -> TicketSettings:
+        unknown = set(changes) - set(SETTING_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown ticket setting(s): {', '.join(sorted(unknown))}")
+
+        old = self.get(guild_id)
+        new = old._replace(**changes)
+        if new == old:
+            return old
+        await ticket_store.save_guild_settings(new)
+        self._cache[guild_id] = new
+        for listener in self._listeners:
+            try:
+                await listener(old, new)
+            except Exception as e:
+                print(f"Ticket settings listener failed: {e}")
+        return new
+
+
+guild_settings = GuildSettingsStore()
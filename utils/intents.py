@@ -0,0 +1,120 @@
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+import discord
+from discord.ext import commands
+
+# Gateway intent that delivers each listener's event. Events not listed here
+# (channels, roles, guild updates, ready, ...) only need the guilds intent.
+EVENT_INTENTS = {
+    "on_member_join": "members",
+    "on_member_remove": "members",
+    "on_raw_member_remove": "members",
+    "on_member_update": "members",
+    "on_presence_update": "presences",
+    "on_message": "guild_messages",
+    "on_message_edit": "guild_messages",
+    "on_message_delete": "guild_messages",
+    "on_bulk_message_delete": "guild_messages",
+    "on_raw_message_edit": "guild_messages",
+    "on_raw_message_delete": "guild_messages",
+    "on_raw_bulk_message_delete": "guild_messages",
+    "on_reaction_add": "guild_reactions",
+    "on_reaction_remove": "guild_reactions",
+    "on_reaction_clear": "guild_reactions",
+    "on_raw_reaction_add": "guild_reactions",
+    "on_raw_reaction_remove": "guild_reactions",
+    "on_raw_reaction_clear": "guild_reactions",
+    "on_typing": "guild_typing",
+    "on_raw_typing": "guild_typing",
+    "on_voice_state_update": "voice_states",
+    "on_invite_create": "invites",
+    "on_invite_delete": "invites",
+    "on_webhooks_update": "webhooks",
+    "on_integration_create": "integrations",
+    "on_integration_update": "integrations",
+    "on_guild_emojis_update": "emojis_and_stickers",
+    "on_guild_stickers_update": "emojis_and_stickers",
+    "on_member_ban": "moderation",
+    "on_member_unban": "moderation",
+    "on_audit_log_entry_create": "moderation",
+    "on_scheduled_event_create": "guild_scheduled_events",
+    "on_scheduled_event_update": "guild_scheduled_events",
+    "on_scheduled_event_delete": "guild_scheduled_events",
+    "on_automod_action": "auto_moderation_execution",
+}
+# The message-based prefix commands in main.py (!sync, !shards, ...) have to read message text
+PREFIX_COMMAND_INTENTS = ("guild_messages", "message_content")
+
+
+def plan_intents(cogs: Iterable[type], extra: Iterable[str] = ()) -> discord.Intents:
+    """The smallest set of intents the given cog classes need.
+
+    Listener names are read from each class (``__cog_listeners__``), so this can
+    run before the bot exists. Needs that don't show up as a listener, like
+    message content or the member cache, are declared on the cog as a
+    ``required_intents`` tuple.
+    """
+    intents = discord.Intents.none()
+    intents.guilds = True # Channel, role and guild caches depend on it
+    for name in extra:
+        setattr(intents, name, True)
+    for cog in cogs:
+        for event_name, _ in getattr(cog, "__cog_listeners__", []):
+            intent = EVENT_INTENTS.get(event_name)
+            if intent:
+                setattr(intents, intent, True)
+        for name in getattr(cog, "required_intents", ()):
+            setattr(intents, name, True)
+    return intents
+
+
+def rss_bytes() -> int:
+    """Current resident set size, or the peak if /proc isn't available."""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource # Unix only, like the peak figure it gives
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class IntentStats:
+    """Counts gateway events by type and the dispatches dropped because nothing listens to them."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.gateway: Dict[str, int] = defaultdict(int)
+        self.filtered: Dict[str, int] = defaultdict(int)
+
+    def record_gateway(self, event_type: str):
+        self.gateway[event_type] += 1
+
+    def record_filtered(self, event_name: str):
+        self.filtered[event_name] += 1
+
+    def report(self, bot: commands.Bot, top: int = 8) -> List[str]:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        enabled = [name for name, value in bot.intents if value]
+        disabled = [name for name, value in discord.Intents.all() if value and not getattr(bot.intents, name)]
+        gateway_total = sum(self.gateway.values())
+        filtered_total = sum(self.filtered.values())
+
+        lines = [
+            f"Intents: {', '.join(enabled)}",
+            f"Not requested: {', '.join(disabled) or 'none'}",
+            f"Gateway events: {gateway_total / elapsed:.2f}/s ({gateway_total} in {elapsed:.0f}s)",
+        ]
+        for event_type, count in sorted(self.gateway.items(), key=lambda item: -item[1])[:top]:
+            lines.append(f"  {event_type}: {count / elapsed:.2f}/s")
+        lines.append(f"Dispatches dropped without listeners: {filtered_total / elapsed:.2f}/s")
+        lines.append(f"Cached members: {sum(len(guild.members) for guild in bot.guilds)}, "
+                     f"RSS: {rss_bytes() / 1024 / 1024:.1f} MiB")
+        return lines
+
+
+intent_stats = IntentStats()
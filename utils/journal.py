@@ -0,0 +1,195 @@
+import asyncio
+import json
+import os
+import traceback
+from typing import Any, Iterator, List, Optional, TextIO
+
+
+def atomic_write_json(path: str, data: Any):
+    """Replace ``path`` with ``data`` so a crash leaves either the old file or the new one, never half of each."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    # Persist the rename itself
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class AppendLog:
+    """Append-only JSON-lines log that sits next to a snapshot file.
+
+    Each change is one short line, so recording it costs the same no matter
+    how much state there is. Compaction is: ``rotate()`` the log aside, write
+    a new snapshot, then ``discard_rotated()``. Records appended while the
+    snapshot is being written go to the fresh log, and ``replay()`` reads
+    the rotated segment first in case a crash happened before it was
+    discarded, so records must be safe to apply twice.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rotated_path = f"{path}.1"
+        self.records = 0 # Appended since the last rotation
+        self._file: Optional[TextIO] = None
+
+    def append(self, record: dict):
+        if self._file is None:
+            self._file = open(self.path, "a")
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self.records += 1
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path) or os.path.exists(self.rotated_path)
+
+    def write_batch(self, records: List[dict]):
+        """Append several records with one write and one fsync. Blocking; meant for a worker thread."""
+        if self._file is None:
+            self._file = open(self.path, "a")
+        self._file.write("".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.records += len(records)
+
+    def replay(self) -> Iterator[dict]:
+        for path in (self.rotated_path, self.path):
+            if not os.path.exists(path):
+                continue
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn line from a crash mid-write
+                        continue
+
+    def rotate(self):
+        self.close()
+        if os.path.exists(self.path):
+            if os.path.exists(self.rotated_path):
+                # The last compaction never finished; keep its records too
+                with open(self.rotated_path, "a") as rotated, open(self.path, "r") as current:
+                    rotated.write(current.read())
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self.rotated_path)
+        self.records = 0
+
+    def discard_rotated(self):
+        if os.path.exists(self.rotated_path):
+            os.remove(self.rotated_path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class GroupCommitLog:
+    """Write-behind front for an AppendLog that group-commits records.
+
+    ``append`` only queues. A background task writes the queue out in one
+    write and one fsync every ``interval`` seconds while anything is
+    waiting, or straight away once ``max_batch`` records are queued, so
+    throughput doesn't depend on how fast the disk can fsync. Anything
+    still queued is lost on a crash; ``flush()`` forces it out.
+    """
+
+    def __init__(self, log: AppendLog, interval: float, max_batch: int):
+        self.log = log
+        self.interval = interval
+        self.max_batch = max_batch
+        self._pending: List[dict] = []
+        self._queued: Optional[asyncio.Event] = None
+        self._full: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @property
+    def records(self) -> int:
+        """Records since the last rotation, queued or written."""
+        return self.log.records + len(self._pending)
+
+    def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._queued = asyncio.Event()
+            self._full = asyncio.Event()
+            self._lock = asyncio.Lock()
+            if self._pending:
+                self._queued.set()
+            self._task = asyncio.create_task(self._run())
+
+    def append(self, record: dict):
+        self._pending.append(record)
+        if self._queued is not None:
+            self._queued.set()
+            if len(self._pending) >= self.max_batch:
+                self._full.set()
+
+    async def flush(self):
+        if self._lock is None:
+            # Never started, so there is no loop-side state to coordinate with
+            self._write(self._pending)
+            self._pending = []
+            return
+        async with self._lock:
+            batch, self._pending = self._pending, []
+            self._queued.clear()
+            self._full.clear()
+            if batch:
+                try:
+                    await asyncio.to_thread(self._write, batch)
+                except Exception:
+                    # Put it back in front of anything queued since
+                    self._pending[:0] = batch
+                    raise
+
+    def _write(self, batch: List[dict]):
+        if batch:
+            self.log.write_batch(batch)
+
+    async def rotate(self):
+        """Write out the queue, then rotate the log; for compaction."""
+        await self.flush()
+        if self._lock is None:
+            self.log.rotate()
+            return
+        async with self._lock:
+            self.log.rotate()
+
+    async def close(self):
+        if self._task is not None:
+            # Cancelling could drop a batch mid-write and leave its thread writing
+            # while the file is closed, so let the loop finish its current flush and exit
+            self._stopping = True
+            self._queued.set()
+            self._full.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        self.log.close()
+
+    async def _run(self):
+        while not self._stopping:
+            await self._queued.wait()
+            if self._stopping:
+                return
+            if len(self._pending) < self.max_batch:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.interval)
+                except asyncio.TimeoutError:
+                    pass
+            try:
+                await self.flush()
+            except Exception:
+                traceback.print_exc()
+                await asyncio.sleep(self.interval)
@@ -0,0 +1,70 @@
+import asyncio
+import json
+import os
+from collections import defaultdict
+from typing import Dict, Optional
+
+from utils.journal import atomic_write_json
+
+MESSAGE_COUNTS_FILE = "message_counts.json"
+# Seconds between saves; counts since the last save are lost on a crash
+FLUSH_INTERVAL = 300
+
+
+class MessageCounter:
+    """Messages sent per member per guild, counted from when the bot started tracking.
+
+    Counting is one dict increment per message. The counts are saved in a
+    thread every FLUSH_INTERVAL seconds, and only when something changed.
+    """
+
+    def __init__(self, path: str = MESSAGE_COUNTS_FILE):
+        self.path = path
+        self.counts: Dict[int, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+        self.load()
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                for guild_id, members in json.load(f).items():
+                    self.counts[int(guild_id)].update({int(user_id): count for user_id, count in members.items()})
+
+    def record(self, guild_id: int, user_id: int):
+        self.counts[guild_id][user_id] += 1
+        self._dirty = True
+
+    def get(self, guild_id: int, user_id: int) -> int:
+        members = self.counts.get(guild_id)
+        return members.get(user_id, 0) if members else 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    async def flush(self):
+        if not self._dirty:
+            return
+        self._dirty = False
+        # Copied on the loop so the thread never sees a dict that is still changing
+        data = {str(guild_id): dict(members) for guild_id, members in self.counts.items()}
+        try:
+            await asyncio.to_thread(atomic_write_json, self.path, data)
+        except Exception:
+            self._dirty = True
+            raise
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            await self.flush()
+
+
+message_counter = MessageCounter()
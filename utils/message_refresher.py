@@ -0,0 +1,99 @@
+import asyncio
+import json
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import discord
+from discord.ext import commands
+
+from utils.metrics import counter
+from utils.scheduler import DeadlineScheduler
+
+with open("config.json", mode="r") as config_file:
+    config = json.load(config_file)
+
+# Minimum seconds between two edits of the same message
+REFRESH_INTERVAL = config.get("message_refresh_interval", 5)
+
+refreshes = counter("message_refresh_total", "Live-count refresh requests (marked) and the message edits they became (edited)", "result")
+
+Render = Callable[[], Optional[dict]]
+
+
+def with_field(embed: discord.Embed, name: str, value: str) -> discord.Embed:
+    """Copy of ``embed`` with the field called ``name`` set to ``value``, added at the end if missing."""
+    embed = embed.copy()
+    for index, field in enumerate(embed.fields):
+        if field.name == name:
+            embed.set_field_at(index, name=name, value=value, inline=field.inline)
+            return embed
+    embed.add_field(name=name, value=value, inline=False)
+    return embed
+
+
+class MessageRefresher:
+    """Coalesces "this message's numbers changed" into at most one edit per message per interval.
+
+    ``mark_dirty`` stores a render callback and schedules an edit for when
+    the interval since the last one has passed; more marks before then just
+    replace the callback. The callback runs at edit time, so whatever it
+    renders is current, and returns the ``Message.edit`` arguments, or None
+    to skip the edit (e.g. the giveaway has ended).
+    """
+
+    def __init__(self, interval: float = REFRESH_INTERVAL):
+        self.interval = interval
+        self.bot: Optional[commands.Bot] = None
+        self.scheduler = DeadlineScheduler(self._refresh, name="message-refresher")
+        self._dirty: Dict[int, Tuple[int, Render]] = {}
+        self._last_edit: Dict[int, float] = {}
+        self._editing: Dict[int, asyncio.Task] = {}
+
+    def start(self, bot: commands.Bot):
+        self.bot = bot
+        self.scheduler.start()
+
+    def mark_dirty(self, channel_id: int, message_id: int, render: Render):
+        refreshes.inc("marked")
+        self._dirty[message_id] = (channel_id, render)
+        if message_id in self.scheduler or message_id in self._editing:
+            # Already due; the edit in flight reschedules itself if still dirty
+            return
+        self.scheduler.schedule(message_id, max(time.time(), self._last_edit.get(message_id, 0) + self.interval))
+
+    async def settle(self, message_id: int):
+        """Drop any pending refresh and wait out one in flight, so a final edit isn't overwritten."""
+        self._dirty.pop(message_id, None)
+        self.scheduler.cancel(message_id)
+        task = self._editing.get(message_id)
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+        self._last_edit.pop(message_id, None)
+
+    async def _refresh(self, message_id: int):
+        entry = self._dirty.pop(message_id, None)
+        if entry is None:
+            return
+        channel_id, render = entry
+        kwargs = render()
+        if kwargs is None:
+            return
+
+        self._editing[message_id] = asyncio.current_task()
+        self._last_edit[message_id] = time.time()
+        try:
+            message = self.bot.get_partial_messageable(channel_id).get_partial_message(message_id)
+            await message.edit(**kwargs)
+            refreshes.inc("edited")
+        except discord.NotFound:
+            self._dirty.pop(message_id, None)
+        except discord.HTTPException as e:
+            print(f"Could not refresh message {message_id}: {e}")
+        finally:
+            del self._editing[message_id]
+
+        if message_id in self._dirty:
+            self.scheduler.schedule(message_id, self._last_edit[message_id] + self.interval)
+
+
+message_refresher = MessageRefresher()
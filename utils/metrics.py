@@ -0,0 +1,167 @@
+import asyncio
+import bisect
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Bucket upper bounds in seconds, roughly doubling from 5ms to 30s
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram.
+
+    Recording is a bisect and an increment, so it is cheap enough to leave on
+    in interaction handlers. Quantiles are estimated from the bucket bounds.
+    """
+
+    def __init__(self, name: str, description: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # The last slot counts everything above the largest bound
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation (0 if empty)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float("inf")
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """(upper bound, observations <= bound) pairs, ending with +Inf."""
+        pairs = []
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            pairs.append((bound, seen))
+        return pairs
+
+    def summary(self) -> str:
+        if not self.count:
+            return f"{self.name}: no samples"
+        mean = self.sum / self.count * 1000
+        return (f"{self.name}: n={self.count} mean={mean:.0f}ms "
+                f"p50<={self.quantile(0.5) * 1000:.0f}ms p95<={self.quantile(0.95) * 1000:.0f}ms "
+                f"p99<={self.quantile(0.99) * 1000:.0f}ms")
+
+
+class Counter:
+    """Monotonic counter split by one label, e.g. per command name."""
+
+    def __init__(self, name: str, description: str, label: str):
+        self.name = name
+        self.description = description
+        self.label = label
+        self.values: Dict[str, int] = defaultdict(int)
+
+    def inc(self, label_value: str, amount: int = 1):
+        self.values[label_value] += amount
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up from a short sleep.
+
+    Anything that blocks the loop (file I/O, sqlite, CPU-heavy work) shows up
+    as lag, which is also how late every other handler and heartbeat runs.
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.histogram = histogram("event_loop_lag_seconds", "How late the event loop woke up from a sleep")
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lag = max(loop.time() - start - self.interval, 0.0)
+            self.max_lag = max(self.max_lag, self.lag)
+            self.histogram.observe(self.lag)
+
+
+histograms: Dict[str, Histogram] = {}
+counters: Dict[str, Counter] = {}
+
+
+def histogram(name: str, description: str = "", buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    """Get or create the histogram registered under ``name``."""
+    if name not in histograms:
+        histograms[name] = Histogram(name, description, buckets)
+    return histograms[name]
+
+
+def counter(name: str, description: str = "", label: str = "name") -> Counter:
+    """Get or create the counter registered under ``name``."""
+    if name not in counters:
+        counters[name] = Counter(name, description, label)
+    return counters[name]
+
+
+loop_lag = LoopLagMonitor()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def prometheus_text(gauges: Iterable[Tuple[str, str, Dict[str, str], float]] = ()) -> str:
+    """Every registered histogram and counter, plus ``(name, description, labels, value)`` gauges, in Prometheus text format."""
+    lines = []
+    described = set()
+    for name, description, labels, value in gauges:
+        if name not in described:
+            described.add(name)
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} gauge")
+        label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+        lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+    for item in counters.values():
+        lines.append(f"# HELP {item.name} {item.description}")
+        lines.append(f"# TYPE {item.name} counter")
+        for label_value, value in sorted(item.values.items()):
+            lines.append(f'{item.name}{{{item.label}="{_escape(label_value)}"}} {value}')
+
+    for item in histograms.values():
+        lines.append(f"# HELP {item.name} {item.description}")
+        lines.append(f"# TYPE {item.name} histogram")
+        for bound, count in item.cumulative():
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{item.name}_bucket{{le="{le}"}} {count}')
+        lines.append(f"{item.name}_sum {item.sum}")
+        lines.append(f"{item.name}_count {item.count}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,131 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from types import CodeType, FrameType
+from typing import Deque, Dict, NamedTuple, Optional, Tuple
+
+from discord.ext import commands
+
+from utils.metrics import counter
+
+with open("config.json", mode="r") as config_file:
+    config = json.load(config_file)
+
+SLOW_CALLBACK_THRESHOLD = config.get("slow_callback_threshold_ms", 100) / 1000
+# Slow callbacks kept for /perf
+SLOW_CALLBACK_HISTORY = 50
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+slow_callback_counts = counter("slow_callbacks_total", "Callbacks that blocked the event loop past the threshold", "cog")
+
+
+class SlowCallback(NamedTuple):
+    at: float # time.time() when the stall was noticed
+    duration: float
+    cog: str
+    command: str
+    location: str
+
+
+class SlowCallbackDetector:
+    """Notices when a single callback holds the event loop for longer than a threshold.
+
+    A task on the loop bumps a timestamp every ``threshold / 2``. A watchdog
+    thread checks it; once the loop has been stuck past the threshold it takes
+    the loop thread's current stack, so the report names the code that is
+    actually blocking rather than whatever ran next. The stack is matched
+    against app command and listener callbacks to find the cog and command.
+    """
+
+    def __init__(self, threshold: float = SLOW_CALLBACK_THRESHOLD):
+        self.threshold = threshold
+        self.recent: Deque[SlowCallback] = deque(maxlen=SLOW_CALLBACK_HISTORY)
+        self.total = 0
+        self.bot: Optional[commands.Bot] = None
+        self._tick = time.perf_counter()
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._callbacks: Dict[CodeType, Tuple[str, str]] = {}
+
+    def start(self, bot: commands.Bot):
+        if self._task is not None:
+            return
+        self.bot = bot
+        self._loop_thread = threading.get_ident()
+        self._tick = time.perf_counter()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="slow-callback-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._stop.set()
+
+    async def _heartbeat(self):
+        while True:
+            self._tick = time.perf_counter()
+            await asyncio.sleep(self.threshold / 2)
+
+    def _watch(self):
+        reported_tick = None
+        stalled: Optional[Tuple[str, str, str]] = None
+        while not self._stop.wait(self.threshold / 4):
+            tick = self._tick
+            if stalled is not None and tick != reported_tick:
+                # The loop is running again; the tick it just made ends the stall
+                duration = tick - reported_tick - self.threshold / 2
+                self._record(max(duration, self.threshold), *stalled)
+                stalled = None
+            if stalled is None and tick != reported_tick and time.perf_counter() - tick > self.threshold:
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is not None:
+                    stalled = self._describe(frame)
+                    reported_tick = tick
+
+    def _record(self, duration: float, cog: str, command: str, location: str):
+        self.total += 1
+        slow_callback_counts.inc(cog)
+        self.recent.append(SlowCallback(time.time(), duration, cog, command, location))
+        print(f"Slow callback: blocked the event loop for {duration * 1000:.0f}ms in {location} ({cog} {command})")
+
+    def _callback_map(self) -> Dict[CodeType, Tuple[str, str]]:
+        # Rebuilt when empty; the cog and command set only changes when cogs are (re)loaded
+        if not self._callbacks and self.bot is not None:
+            for command in self.bot.tree.walk_commands():
+                callback = getattr(command, "callback", None)
+                if callback is not None:
+                    cog = type(command.binding).__name__ if command.binding else "-"
+                    self._callbacks[callback.__code__] = (cog, f"/{command.qualified_name}")
+            for cog_name, cog in self.bot.cogs.items():
+                for name, method in cog.get_listeners():
+                    self._callbacks[method.__code__] = (cog_name, name)
+        return self._callbacks
+
+    def reset_callbacks(self):
+        self._callbacks = {}
+
+    def _describe(self, frame: FrameType) -> Tuple[str, str, str]:
+        callbacks = self._callback_map()
+        location = None
+        cog, command = "-", "-"
+        while frame is not None:
+            code = frame.f_code
+            if location is None and code.co_filename.startswith(PROJECT_ROOT):
+                location = f"{os.path.relpath(code.co_filename, PROJECT_ROOT)}:{frame.f_lineno} {code.co_name}"
+            if code in callbacks:
+                cog, command = callbacks[code]
+                break
+            frame = frame.f_back
+        return cog, command, location or "outside the bot's code"
+
+
+slow_callbacks = SlowCallbackDetector()
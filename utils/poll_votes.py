@@ -0,0 +1,49 @@
+from typing import Dict, Iterable, List, Optional
+
+
+class VoteTally:
+    """Each voter's current option plus a running count per option.
+
+    Casting or changing a vote is two dict updates however many people have
+    voted, and results read the counters instead of counting voters.
+    """
+
+    __slots__ = ("options", "choices", "counts")
+
+    def __init__(self, options: Iterable[str], choices: Optional[Dict[int, str]] = None):
+        self.options = list(options)
+        self.counts: Dict[str, int] = {option: 0 for option in self.options}
+        self.choices: Dict[int, str] = {}
+        for user_id, option in (choices or {}).items():
+            # Votes for options that no longer exist are dropped
+            if option in self.counts:
+                self.choices[user_id] = option
+                self.counts[option] += 1
+
+    @classmethod
+    def from_votes(cls, options: Iterable[str], votes: Dict[str, List[int]]) -> "VoteTally":
+        """Build from the older option -> [user IDs] layout."""
+        return cls(options, {user_id: option for option, user_ids in votes.items() for user_id in user_ids})
+
+    def vote(self, user_id: int, option: str) -> Optional[str]:
+        """Record ``user_id``'s vote for ``option``, replacing any earlier one, and return the earlier option."""
+        if option not in self.counts:
+            raise KeyError(option)
+        previous = self.choices.get(user_id)
+        if previous != option:
+            if previous is not None:
+                self.counts[previous] -= 1
+            self.choices[user_id] = option
+            self.counts[option] += 1
+        return previous
+
+    @property
+    def total(self) -> int:
+        return len(self.choices)
+
+    def to_dict(self) -> Dict[str, str]:
+        return {str(user_id): option for user_id, option in self.choices.items()}
+
+    @classmethod
+    def from_dict(cls, options: Iterable[str], data: Dict[str, str]) -> "VoteTally":
+        return cls(options, {int(user_id): option for user_id, option in data.items()})
@@ -0,0 +1,115 @@
+import asyncio
+import heapq
+import itertools
+import time
+import traceback
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+# Upper bound on one sleep, so a wall-clock jump (NTP, suspend) is noticed within this many seconds
+MAX_SLEEP = 300.0
+
+
+class DeadlineScheduler:
+    """Calls ``callback(key)`` once each key's deadline (epoch seconds) has passed.
+
+    Deadlines sit in a heap and a single task sleeps until the earliest one,
+    waking early whenever something is scheduled or cancelled, so nothing is
+    scanned on a timer and a deadline fires on time however many are pending.
+    Rescheduling or cancelling leaves the old heap entry behind; it is skipped
+    when it reaches the top, and the heap is rebuilt if those pile up.
+
+    With ``retry_delay`` set, a key whose callback raises is scheduled again
+    that many seconds later instead of being dropped.
+    """
+
+    def __init__(self, callback: Callable[[Hashable], Awaitable[None]], name: str = "deadline-scheduler",
+                 retry_delay: Optional[float] = None):
+        self.callback = callback
+        self.name = name
+        self.retry_delay = retry_delay
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._entries: Dict[Hashable, Tuple[float, int]] = {}
+        self._counter = itertools.count()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def deadline(self, key: Hashable) -> Optional[float]:
+        entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def schedule(self, key: Hashable, when: float):
+        """Fire ``key`` at ``when``, replacing any deadline it already had."""
+        entry = (when, next(self._counter))
+        self._entries[key] = entry
+        heapq.heappush(self._heap, (*entry, key))
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._rebuild()
+        self._notify()
+
+    def cancel(self, key: Hashable):
+        if self._entries.pop(key, None) is not None:
+            self._notify()
+
+    def start(self):
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _notify(self):
+        if self._wake is not None:
+            self._wake.set()
+
+    def _rebuild(self):
+        self._heap = [(when, seq, key) for key, (when, seq) in self._entries.items()]
+        heapq.heapify(self._heap)
+
+    def _pop_stale(self):
+        while self._heap:
+            when, seq, key = self._heap[0]
+            if self._entries.get(key) == (when, seq):
+                return
+            heapq.heappop(self._heap)
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            self._pop_stale()
+            if not self._heap:
+                await self._wake.wait()
+                continue
+
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=min(delay, MAX_SLEEP))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, _, key = heapq.heappop(self._heap)
+            del self._entries[key]
+            task = asyncio.create_task(self._fire(key))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _fire(self, key: Hashable):
+        try:
+            await self.callback(key)
+        except Exception:
+            print(f"{self.name}: callback for {key!r} failed")
+            traceback.print_exc()
+            # Unless the callback already gave the key a new deadline
+            if self.retry_delay is not None and key not in self._entries:
+                self.schedule(key, time.time() + self.retry_delay)
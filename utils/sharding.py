@@ -0,0 +1,180 @@
+import json
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+from discord.ext import commands
+from discord.utils import MISSING
+
+from utils.command_sync import CommandSyncManager
+from utils.intents import intent_stats
+from utils.tracing import TracingCommandTree
+
+with open("config.json", mode="r") as config_file:
+    config = json.load(config_file)
+
+# Sharding is opt-in; with no shard_count Discord's recommended count is used
+SHARDING = config.get("sharding", False)
+SHARD_COUNT = config.get("shard_count")
+# Event rates are averaged over this many seconds
+RATE_WINDOW = 60
+
+
+class ShardMetrics:
+    """Per-shard event rates and connection counters.
+
+    Events are attributed to a shard from the guild they belong to, the same way
+    Discord routes them. Events without a guild (DMs, gateway internals) are not
+    counted. Rates use one counter per second over the last ``RATE_WINDOW``
+    seconds, so recording is an index and an increment.
+    """
+
+    def __init__(self):
+        self.totals: Dict[int, int] = defaultdict(int)
+        self.connects: Dict[int, int] = defaultdict(int)
+        self.disconnects: Dict[int, int] = defaultdict(int)
+        self.resumes: Dict[int, int] = defaultdict(int)
+        self._buckets: Dict[int, List[List[int]]] = {}
+
+    def attach(self, bot: commands.Bot):
+        bot.add_listener(self.on_shard_connect)
+        bot.add_listener(self.on_shard_disconnect)
+        bot.add_listener(self.on_shard_resumed)
+
+    async def on_shard_connect(self, shard_id: int):
+        self.connects[shard_id] += 1
+
+    async def on_shard_disconnect(self, shard_id: int):
+        self.disconnects[shard_id] += 1
+
+    async def on_shard_resumed(self, shard_id: int):
+        self.resumes[shard_id] += 1
+
+    def record_dispatch(self, shard_count: Optional[int], args: tuple):
+        if not args:
+            return
+        first = args[0]
+        guild_id = getattr(first, "guild_id", None)
+        if guild_id is None:
+            guild = getattr(first, "guild", None)
+            if guild is None:
+                return
+            guild_id = guild.id
+        self.record((guild_id >> 22) % shard_count if shard_count else 0)
+
+    def record(self, shard_id: int):
+        now = int(time.monotonic())
+        buckets = self._buckets.get(shard_id)
+        if buckets is None:
+            buckets = self._buckets[shard_id] = [[0, 0] for _ in range(RATE_WINDOW)]
+        bucket = buckets[now % RATE_WINDOW]
+        if bucket[0] != now:
+            bucket[0] = now
+            bucket[1] = 0
+        bucket[1] += 1
+        self.totals[shard_id] += 1
+
+    def rate(self, shard_id: int) -> float:
+        """Events per second for ``shard_id`` over the last ``RATE_WINDOW`` seconds."""
+        buckets = self._buckets.get(shard_id)
+        if buckets is None:
+            return 0.0
+        now = int(time.monotonic())
+        return sum(count for second, count in buckets if now - second < RATE_WINDOW) / RATE_WINDOW
+
+    def snapshot(self, bot: commands.Bot) -> List[dict]:
+        """One dict per shard with its latency (seconds), event rate and connection counters."""
+        if isinstance(bot, commands.AutoShardedBot):
+            latencies = bot.latencies
+        else:
+            latencies = [(bot.shard_id or 0, bot.latency)]
+        return [
+            {
+                "shard": shard_id,
+                "latency": latency,
+                "events_per_second": self.rate(shard_id),
+                "events": self.totals[shard_id],
+                "connects": self.connects[shard_id],
+                "disconnects": self.disconnects[shard_id],
+                "resumes": self.resumes[shard_id],
+            }
+            for shard_id, latency in latencies
+        ]
+
+
+shard_metrics = ShardMetrics()
+
+
+class _MeteredDispatch:
+    """Counts events for the shard and gateway metrics, then drops the ones nothing listens to.
+
+    discord.py looks up an ``on_<event>`` method and the registered listeners on
+    every dispatch. The names that have a listener are cached here and the cache
+    is reset whenever listeners change, so unheard events stop at a set lookup.
+    """
+
+    _listened: Optional[Set[str]] = None
+    _waited: Set[str] = frozenset()
+
+    def _listened_events(self) -> Set[str]:
+        if self._listened is None:
+            listened = {name[3:] for name in self.extra_events}
+            listened.update(name[3:] for name in dir(self) if name.startswith("on_"))
+            self._listened = listened | self._waited
+        return self._listened
+
+    def dispatch(self, event_name: str, /, *args, **kwargs):
+        if event_name == "socket_event_type":
+            intent_stats.record_gateway(args[0])
+            # One per gateway event; counting it as filtered would double the whole gateway rate
+            if event_name not in self._listened_events():
+                return
+        else:
+            shard_metrics.record_dispatch(self.shard_count, args)
+            if event_name not in self._listened_events():
+                intent_stats.record_filtered(event_name)
+                return
+        super().dispatch(event_name, *args, **kwargs)
+
+    def add_listener(self, func, /, name=MISSING):
+        super().add_listener(func, name)
+        self._listened = None
+
+    def remove_listener(self, func, /, name=MISSING):
+        super().remove_listener(func, name)
+        self._listened = None
+
+    def event(self, coro, /):
+        coro = super().event(coro)
+        self._listened = None
+        return coro
+
+    def wait_for(self, event: str, /, *, check=None, timeout=None):
+        # Waiters aren't listeners, so keep dispatching anything that was ever waited for
+        self._waited = self._waited | {event}
+        self._listened = None
+        return super().wait_for(event, check=check, timeout=timeout)
+
+
+class MeteredBot(_MeteredDispatch, commands.Bot):
+    pass
+
+
+class MeteredShardedBot(_MeteredDispatch, commands.AutoShardedBot):
+    pass
+
+
+def build_bot(**options) -> commands.Bot:
+    """Create the bot, sharded if config.json enables it, with shard metrics and command tracing attached.
+
+    ``bot.sync_manager`` is the one CommandSyncManager for the bot; everything
+    that syncs the tree must use it, since it caches the last synced state.
+    """
+    options.setdefault("tree_cls", TracingCommandTree)
+    if SHARDING:
+        bot = MeteredShardedBot(shard_count=SHARD_COUNT, **options)
+    else:
+        bot = MeteredBot(**options)
+    shard_metrics.attach(bot)
+    bot.sync_manager = CommandSyncManager(bot.tree)
+    return bot
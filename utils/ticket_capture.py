@@ -0,0 +1,86 @@
+import json
+from typing import Optional
+
+import discord
+
+from utils.ticket_store import ticket_store
+from utils.ticket_owners import ticket_owners
+
+
+def _attachment_data(attachments):
+    return [{"filename": a["filename"], "url": a["url"]} if isinstance(a, dict) else {"filename": a.filename, "url": a.url}
+            for a in attachments]
+
+
+def _embed_data(embeds):
+    data = []
+    for embed in embeds:
+        if isinstance(embed, dict):
+            title, description = embed.get("title"), embed.get("description")
+        else:
+            title, description = embed.title, embed.description
+        if title or description:
+            data.append({"title": title, "description": description})
+    return data
+
+
+def _extra(attachments, embeds) -> Optional[str]:
+    extra = {}
+    if attachments:
+        extra["attachments"] = _attachment_data(attachments)
+    embed_data = _embed_data(embeds)
+    if embed_data:
+        extra["embeds"] = embed_data
+    return json.dumps(extra, separators=(",", ":")) if extra else None
+
+
+class TicketCapture:
+    """Appends messages from open ticket channels to the ``ticket_message`` table as they arrive.
+
+    Closing a ticket then renders the transcript from this log instead of paging
+    through the channel history. Only channels known to ``ticket_owners`` are
+    recorded, so the listeners cost a dict lookup for every other message.
+    """
+
+    async def on_message(self, message: discord.Message):
+        if not ticket_owners.is_ticket(message.channel.id):
+            return
+        author = message.author
+        await ticket_store.add_message(
+            message.id,
+            message.channel.id,
+            author.id,
+            author.display_name,
+            author.display_avatar.url,
+            message.content,
+            _extra(message.attachments, message.embeds),
+            message.created_at.timestamp(),
+        )
+
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        if not ticket_owners.is_ticket(payload.channel_id):
+            return
+        data = payload.data
+        if "content" not in data:
+            # Embed-only updates (link previews) don't change what was said
+            return
+        # Link-preview unfurls resend the content with no edited_timestamp; only real edits mark the message edited
+        edited = discord.utils.parse_time(data.get("edited_timestamp"))
+        await ticket_store.edit_message(
+            payload.message_id,
+            data["content"],
+            _extra(data.get("attachments", []), data.get("embeds", [])),
+            edited.timestamp() if edited else None,
+        )
+
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        if ticket_owners.is_ticket(payload.channel_id):
+            await ticket_store.mark_message_deleted(payload.message_id)
+
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        if ticket_owners.is_ticket(payload.channel_id):
+            for message_id in payload.message_ids:
+                await ticket_store.mark_message_deleted(message_id)
+
+
+ticket_capture = TicketCapture()
@@ -0,0 +1,96 @@
+import asyncio
+import json
+from typing import Awaitable, Callable, Optional, Set
+
+from utils.ticket_store import ticket_store
+
+with open("config.json", mode="r") as config_file:
+    config = json.load(config_file)
+
+CLOSE_WORKERS = config.get("ticket_close_workers", 4)
+MAX_ATTEMPTS = config.get("ticket_close_max_attempts", 5)
+BACKOFF_BASE = 5 # seconds, doubled after every failed attempt
+BACKOFF_MAX = 300
+
+
+class TicketCloseQueue:
+    """Runs ticket closes in the background with a fixed pool of workers.
+
+    The close request itself is persisted on the ticket row by
+    ``TicketStore.queue_close`` before it reaches this queue, so closes survive a
+    restart and are picked up again by ``start``. ``handler`` does the actual work
+    for one ticket channel; if it raises, the close is retried with exponential
+    backoff until ``max_attempts`` is reached, after which ``on_give_up`` is
+    called with the channel id and the last error.
+    """
+
+    def __init__(self, handler: Callable[[int], Awaitable[None]], on_give_up: Callable[[int, Exception], Awaitable[None]],
+                 workers: int = CLOSE_WORKERS, max_attempts: int = MAX_ATTEMPTS):
+        self.handler = handler
+        self.on_give_up = on_give_up
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.bot = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued: Set[int] = set()
+        self._tasks = []
+        self._retries: Set[asyncio.Task] = set()
+
+    def start(self, bot):
+        if self._tasks:
+            return
+        self.bot = bot
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._resume_pending()))
+
+    async def stop(self):
+        # Backoff sleeps are dropped too; the rows are still 'closing' and resume on the next start
+        tasks = self._tasks + list(self._retries)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._retries.clear()
+        self._queued.clear()
+
+    def put(self, channel_id: int):
+        if self._queue is None or channel_id in self._queued:
+            return
+        self._queued.add(channel_id)
+        self._queue.put_nowait(channel_id)
+
+    async def _resume_pending(self):
+        await self.bot.wait_until_ready()
+        pending = await ticket_store.pending_closes()
+        if pending:
+            print(f"Resuming {len(pending)} pending ticket close(s).")
+        for channel_id in pending:
+            self.put(channel_id)
+
+    async def _retry_later(self, channel_id: int, delay: float):
+        await asyncio.sleep(delay)
+        self.put(channel_id)
+
+    async def _worker(self):
+        while True:
+            channel_id = await self._queue.get()
+            try:
+                await self.handler(channel_id)
+            except Exception as e:
+                attempts = await ticket_store.record_close_attempt(channel_id)
+                if attempts >= self.max_attempts:
+                    print(f"Giving up closing ticket {channel_id} after {attempts} attempts: {e}")
+                    try:
+                        await self.on_give_up(channel_id, e)
+                    except Exception as give_up_error:
+                        print(f"Could not mark ticket {channel_id} as failed: {give_up_error}")
+                else:
+                    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+                    print(f"Closing ticket {channel_id} failed ({e}), retrying in {delay}s.")
+                    task = asyncio.create_task(self._retry_later(channel_id, delay))
+                    self._retries.add(task)
+                    task.add_done_callback(self._retries.discard)
+            finally:
+                self._queued.discard(channel_id)
+                self._queue.task_done()
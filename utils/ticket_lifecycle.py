@@ -0,0 +1,184 @@
+import json
+import time
+from datetime import datetime
+from typing import Optional
+
+import discord
+import pytz
+from discord import Embed, Color
+
+from utils.ticket_store import ticket_store
+from utils.ticket_owners import ticket_owners
+from utils.guild_settings import guild_settings
+from utils.ticket_close_queue import TicketCloseQueue
+from utils.transcripts import render_transcript, deliver_transcript
+
+with open("config.json", mode="r") as config_file:
+    config = json.load(config_file)
+
+# Tickets from before per-guild settings stored their creation time in this timezone
+TIMEZONE = config["timezone"]
+# Reserved rows without a channel older than this are leftovers from a crash mid-creation
+ORPHAN_AGE = 600
+
+# Ticket states, stored in ticket.state by the conditional UPDATEs in ticket_store:
+#   open -> claimed -> closing -> closed
+#   open ----------->  closing
+# "closed" is not stored, the row is removed once the channel is gone. A close
+# that gave up stays "closing" with close_state 'failed' until it is requested again.
+
+
+def legacy_timestamp(date_string: str) -> int:
+    """Convert the old 'YYYY-MM-DD HH:MM:SS' ticket_created strings (local to TIMEZONE) to epoch seconds."""
+    dt_obj = datetime.strptime(date_string, "%Y-%m-%d %H:%M:%S")
+    try:
+        dt_obj = pytz.timezone(TIMEZONE).localize(dt_obj)
+    except pytz.UnknownTimeZoneError:
+        print(f"Warning: Unknown timezone '{TIMEZONE}'. Using UTC.")
+        dt_obj = pytz.utc.localize(dt_obj)
+    return int(dt_obj.timestamp())
+
+
+class TicketLifecycle:
+    """The single place that moves tickets between states.
+
+    Views and slash commands call into this instead of touching the store or
+    building transcripts themselves. Each transition is one conditional UPDATE in
+    the store, so two staff members pressing buttons at once can't both win.
+    Timestamps are stored as epoch seconds and used as-is in Discord's ``<t:...>``
+    markup.
+    """
+
+    def __init__(self):
+        self.bot = None
+        self.close_queue = TicketCloseQueue(self._close, self._close_failed)
+
+    async def start(self, bot):
+        self.bot = bot
+        migrated = await ticket_store.backfill_created_at(legacy_timestamp)
+        if migrated:
+            print(f"Converted {migrated} ticket creation date(s) to epoch timestamps.")
+        # Tickets from before they were per guild all belong to the configured guild
+        assigned = await ticket_store.backfill_guild(config["guild_id"])
+        if assigned:
+            print(f"Assigned {assigned} ticket(s) to guild {config['guild_id']}.")
+        orphans = await ticket_store.delete_orphans(int(time.time()) - ORPHAN_AGE)
+        if orphans:
+            print(f"Removed {orphans} ticket(s) that never got a channel.")
+        await ticket_owners.warm()
+        self.close_queue.start(bot)
+
+    async def stop(self):
+        await self.close_queue.stop()
+
+    def creator_of(self, channel_id: int) -> Optional[int]:
+        """The creator of the ticket in ``channel_id``, or None if it isn't a ticket channel. Never hits the database."""
+        return ticket_owners.creator_of(channel_id)
+
+    async def open_ticket(self, guild_id: int, user: discord.abc.User) -> Optional[int]:
+        """Reserve a new open ticket for ``user`` in ``guild_id`` and return its ticket number.
+
+        Returns None if the user already has a ticket in that guild. The caller
+        must either ``attach_channel`` or ``abandon`` the reserved number.
+        """
+        if ticket_owners.has_ticket(guild_id, user.id):
+            return None
+        ticket_number = await ticket_store.reserve_ticket(guild_id, user.name, user.id, int(time.time()))
+        if ticket_number is not None:
+            ticket_owners.reserve(guild_id, user.id)
+        return ticket_number
+
+    async def abandon(self, ticket_number: int, guild_id: int, user: discord.abc.User):
+        await ticket_store.release_ticket(ticket_number)
+        ticket_owners.release(guild_id, user.id)
+
+    async def attach_channel(self, ticket_number: int, guild_id: int, user: discord.abc.User, channel_id: int):
+        # Cached before the write so capture records the first message sent
+        ticket_owners.attach(guild_id, user.id, channel_id)
+        await ticket_store.set_ticket_channel(ticket_number, channel_id)
+
+    async def claim(self, channel_id: int, claimer: discord.abc.User) -> bool:
+        """open -> claimed. Returns False if the ticket was not open."""
+        return await ticket_store.claim_ticket(channel_id, claimer.id, int(time.time()))
+
+    async def unclaim(self, channel_id: int, claimer: discord.abc.User):
+        """claimed -> open, for a claim whose permission or message edits failed."""
+        await ticket_store.unclaim_ticket(channel_id, claimer.id)
+
+    async def request_close(self, channel_id: int, reason: Optional[str], closer: discord.abc.User) -> bool:
+        """open/claimed -> closing. The transcript and channel delete run on the close workers.
+
+        Returns False if the ticket is already closing.
+        """
+        if not await ticket_store.queue_close(channel_id, reason, closer.id, closer.name):
+            return False
+        self.close_queue.put(channel_id)
+        return True
+
+    async def _close(self, channel_id: int):
+        """closing -> closed. Runs on a close worker and may be retried."""
+        job = await ticket_store.get_close_job(channel_id)
+        if job is None:
+            return
+        id, ticket_creator_id, created_at, close_state, close_reason, closer_id, closer_name, dm_delivered, log_delivered = job
+
+        channel = self.bot.get_channel(channel_id)
+        if channel is None:
+            # The channel is already gone (deleted by hand or by an earlier attempt)
+            await self._mark_closed(channel_id)
+            return
+
+        # 'delivered' means an earlier attempt already sent the transcript everywhere;
+        # otherwise only the destinations not yet reached are sent again
+        if close_state == "pending":
+            await self._send_transcript(channel, id, ticket_creator_id, created_at, close_reason, closer_id,
+                                        not dm_delivered, not log_delivered)
+            await ticket_store.set_close_state(channel_id, "delivered")
+
+        reason = f"Ticket Closed by {closer_name}"
+        if close_reason:
+            reason += f" - Reason: {close_reason}"
+        await channel.delete(reason=reason)
+        await self._mark_closed(channel_id)
+
+    async def _close_failed(self, channel_id: int, error: Exception):
+        """Called once the close workers give up. Staff can press Close or use /delete to try again."""
+        await ticket_store.set_close_state(channel_id, "failed")
+        channel = self.bot.get_channel(channel_id)
+        if channel is not None:
+            await channel.send(
+                f"Closing this ticket failed after {self.close_queue.max_attempts} attempts ({error}). "
+                "Close it again or use /delete to retry."
+            )
+
+    async def _mark_closed(self, channel_id: int):
+        await ticket_store.delete_ticket(channel_id)
+        ticket_owners.remove_channel(channel_id)
+
+    async def _send_transcript(self, channel, id, ticket_creator_id, created_at, close_reason, closer_id, send_dm, send_log):
+        ticket_creator = channel.guild.get_member(ticket_creator_id)
+        settings = guild_settings.get(channel.guild.id)
+        log_channel = self.bot.get_channel(settings.log_channel_id) if settings.log_channel_id else None
+
+        # Creating the Transcript (rendered and encoded once for every destination)
+        transcript = await render_transcript(channel, self.bot, settings.timezone)
+        if transcript is None:
+            await channel.send("Warning: Could not generate transcript for this ticket.")
+
+        transcript_info = Embed(title=f"Ticket Deleted | {channel.name}", color=Color.purple())
+        transcript_info.add_field(name="ID", value=id, inline=True)
+        transcript_info.add_field(name="Opened by", value=ticket_creator.mention if ticket_creator else "Unknown User", inline=True)
+        transcript_info.add_field(name="Closed by", value=f"<@{closer_id}>", inline=True)
+        if close_reason:
+            transcript_info.add_field(name="Close Reason", value=close_reason, inline=False)
+        if created_at:
+            transcript_info.add_field(name="Ticket Created", value=f"<t:{created_at}:f>", inline=True)
+        transcript_info.add_field(name="Ticket Closed", value=f"<t:{int(time.time())}:f>", inline=True)
+
+        async def on_delivered(destination: str):
+            await ticket_store.mark_transcript_delivered(channel.id, destination)
+
+        await deliver_transcript(transcript_info, transcript, ticket_creator, log_channel, send_dm, send_log, on_delivered)
+
+
+ticket_lifecycle = TicketLifecycle()
@@ -0,0 +1,59 @@
+from typing import Dict, Optional, Tuple
+
+from utils.ticket_store import ticket_store
+
+
+class TicketOwners:
+    """In-memory map of ticket channels to their creators and back.
+
+    Permission and duplicate-ticket checks run on every button press, so they
+    read from here instead of sqlite. The map is loaded once at startup and
+    ``TicketLifecycle`` updates it right after each write to the store. Creators
+    are keyed by (guild id, user id), since a member may have one ticket in
+    every guild; a ticket that is reserved but has no channel yet maps to None.
+    """
+
+    def __init__(self):
+        self._by_channel: Dict[int, Tuple[int, int]] = {}
+        self._by_creator: Dict[Tuple[int, int], Optional[int]] = {}
+
+    async def warm(self):
+        self._by_channel.clear()
+        self._by_creator.clear()
+        for guild_id, creator_id, channel_id in await ticket_store.owners():
+            self._by_creator[guild_id, creator_id] = channel_id
+            if channel_id is not None:
+                self._by_channel[channel_id] = (guild_id, creator_id)
+
+    def creator_of(self, channel_id: int) -> Optional[int]:
+        owner = self._by_channel.get(channel_id)
+        return owner[1] if owner else None
+
+    def channel_of(self, guild_id: int, creator_id: int) -> Optional[int]:
+        return self._by_creator.get((guild_id, creator_id))
+
+    def is_ticket(self, channel_id: int) -> bool:
+        return channel_id in self._by_channel
+
+    def has_ticket(self, guild_id: int, creator_id: int) -> bool:
+        return (guild_id, creator_id) in self._by_creator
+
+    def reserve(self, guild_id: int, creator_id: int):
+        self._by_creator[guild_id, creator_id] = None
+
+    def attach(self, guild_id: int, creator_id: int, channel_id: int):
+        self._by_creator[guild_id, creator_id] = channel_id
+        self._by_channel[channel_id] = (guild_id, creator_id)
+
+    def release(self, guild_id: int, creator_id: int):
+        channel_id = self._by_creator.pop((guild_id, creator_id), None)
+        if channel_id is not None:
+            self._by_channel.pop(channel_id, None)
+
+    def remove_channel(self, channel_id: int):
+        owner = self._by_channel.pop(channel_id, None)
+        if owner is not None:
+            self._by_creator.pop(owner, None)
+
+
+ticket_owners = TicketOwners()
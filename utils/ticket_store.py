@@ -0,0 +1,323 @@
+import asyncio
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+DATABASE_FILE = "Database.db"
+READER_COUNT = 4
+STATEMENT_CACHE_SIZE = 64
+
+# Statements are kept as module constants so sqlite3's per-connection statement
+# cache (keyed by the SQL text) reuses the prepared statement on every call.
+CREATE_TABLE = """CREATE TABLE IF NOT EXISTS ticket
+           (id INTEGER PRIMARY KEY AUTOINCREMENT, discord_name TEXT, discord_id INTEGER, ticket_channel INTEGER UNIQUE, ticket_created TEXT)"""
+CREATE_MESSAGE_TABLE = """CREATE TABLE IF NOT EXISTS ticket_message
+           (message_id INTEGER PRIMARY KEY, channel_id INTEGER NOT NULL, author_id INTEGER, author_name TEXT, author_avatar TEXT,
+            content TEXT, extra TEXT, created_at REAL, edited_at REAL, deleted INTEGER NOT NULL DEFAULT 0)"""
+CREATE_SETTINGS_TABLE = """CREATE TABLE IF NOT EXISTS guild_settings
+           (guild_id INTEGER PRIMARY KEY, ticket_channel_id INTEGER, category_id INTEGER, team_role_id INTEGER, log_channel_id INTEGER,
+            timezone TEXT, embed_title TEXT, embed_description TEXT)"""
+# ticket_channel is UNIQUE, so sqlite already keeps an index on it for the channel lookups.
+# One open ticket per member per guild; the index also serves the creator lookups.
+CREATE_CREATOR_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS ticket_guild_creator ON ticket (guild_id, discord_id)"
+CREATE_STATE_INDEX = "CREATE INDEX IF NOT EXISTS ticket_state ON ticket (state)"
+CREATE_MESSAGE_INDEX = "CREATE INDEX IF NOT EXISTS ticket_message_channel ON ticket_message (channel_id, message_id)"
+# Columns added after the original schema, applied to existing databases on startup
+MIGRATED_COLUMNS = {
+    "close_state": "TEXT",
+    "close_reason": "TEXT",
+    "closer_id": "INTEGER",
+    "closer_name": "TEXT",
+    "close_attempts": "INTEGER NOT NULL DEFAULT 0",
+    "state": "TEXT NOT NULL DEFAULT 'open'",
+    "created_at": "INTEGER",
+    "claimed_by": "INTEGER",
+    "claimed_at": "INTEGER",
+    "guild_id": "INTEGER",
+    "dm_delivered": "INTEGER NOT NULL DEFAULT 0",
+    "log_delivered": "INTEGER NOT NULL DEFAULT 0",
+}
+# Databases from before tickets were per guild have a UNIQUE discord_id, which sqlite can
+# only drop by rebuilding the table
+RENAME_LEGACY_TABLE = "ALTER TABLE ticket RENAME TO ticket_legacy"
+DROP_LEGACY_TABLE = "DROP TABLE ticket_legacy"
+KEEP_LEGACY_SEQUENCE = "UPDATE sqlite_sequence SET seq = MAX(seq, (SELECT seq FROM sqlite_sequence WHERE name = 'ticket_legacy')) WHERE name = 'ticket'"
+SELECT_BY_CHANNEL = "SELECT id, discord_id, created_at, state FROM ticket WHERE ticket_channel=?"
+SELECT_CREATOR = "SELECT discord_id FROM ticket WHERE ticket_channel=?"
+SELECT_BY_CREATOR = "SELECT discord_id FROM ticket WHERE guild_id=? AND discord_id=?"
+INSERT_TICKET = "INSERT INTO ticket (guild_id, discord_name, discord_id, created_at, state) VALUES (?, ?, ?, ?, 'open')"
+UPDATE_CHANNEL = "UPDATE ticket SET ticket_channel = ? WHERE id = ?"
+DELETE_BY_CHANNEL = "DELETE FROM ticket WHERE ticket_channel=?"
+DELETE_BY_ID = "DELETE FROM ticket WHERE id = ? AND ticket_channel IS NULL"
+DELETE_ORPHANS = "DELETE FROM ticket WHERE ticket_channel IS NULL AND created_at < ?"
+CLAIM_TICKET = "UPDATE ticket SET state = 'claimed', claimed_by = ?, claimed_at = ? WHERE ticket_channel = ? AND state = 'open'"
+UNCLAIM_TICKET = "UPDATE ticket SET state = 'open', claimed_by = NULL, claimed_at = NULL WHERE ticket_channel = ? AND state = 'claimed' AND claimed_by = ?"
+# A close that gave up (close_state 'failed') can be requested again
+QUEUE_CLOSE = "UPDATE ticket SET state = 'closing', close_state = 'pending', close_reason = ?, closer_id = ?, closer_name = ?, close_attempts = 0 WHERE ticket_channel = ? AND (state IN ('open', 'claimed') OR close_state = 'failed')"
+SELECT_CLOSE_JOB = "SELECT id, discord_id, created_at, close_state, close_reason, closer_id, closer_name, dm_delivered, log_delivered FROM ticket WHERE ticket_channel=? AND state = 'closing'"
+SELECT_PENDING_CLOSES = "SELECT ticket_channel FROM ticket WHERE state = 'closing' AND close_state IN ('pending', 'delivered') ORDER BY id"
+SELECT_LEGACY_CREATED = "SELECT id, ticket_created FROM ticket WHERE created_at IS NULL AND ticket_created IS NOT NULL"
+UPDATE_CREATED_AT = "UPDATE ticket SET created_at = ? WHERE id = ?"
+BACKFILL_GUILD = "UPDATE ticket SET guild_id = ? WHERE guild_id IS NULL"
+UPDATE_CLOSE_STATE = "UPDATE ticket SET close_state = ? WHERE ticket_channel = ?"
+# One per transcript destination, so a retried close only resends what failed
+MARK_DM_DELIVERED = "UPDATE ticket SET dm_delivered = 1 WHERE ticket_channel = ?"
+MARK_LOG_DELIVERED = "UPDATE ticket SET log_delivered = 1 WHERE ticket_channel = ?"
+INCREMENT_CLOSE_ATTEMPTS = "UPDATE ticket SET close_attempts = close_attempts + 1 WHERE ticket_channel = ?"
+SELECT_CLOSE_ATTEMPTS = "SELECT close_attempts FROM ticket WHERE ticket_channel = ?"
+SELECT_OWNERS = "SELECT guild_id, discord_id, ticket_channel FROM ticket"
+INSERT_MESSAGE = "INSERT OR REPLACE INTO ticket_message (message_id, channel_id, author_id, author_name, author_avatar, content, extra, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+UPDATE_MESSAGE = "UPDATE ticket_message SET content = ?, extra = COALESCE(?, extra), edited_at = COALESCE(?, edited_at) WHERE message_id = ?"
+MARK_MESSAGE_DELETED = "UPDATE ticket_message SET deleted = 1 WHERE message_id = ?"
+SELECT_MESSAGES = "SELECT author_id, author_name, author_avatar, content, extra, created_at, edited_at, deleted FROM ticket_message WHERE channel_id = ? ORDER BY message_id"
+DELETE_MESSAGES = "DELETE FROM ticket_message WHERE channel_id = ?"
+SELECT_GUILD_SETTINGS = "SELECT guild_id, ticket_channel_id, category_id, team_role_id, log_channel_id, timezone, embed_title, embed_description FROM guild_settings"
+SAVE_GUILD_SETTINGS = "INSERT OR REPLACE INTO guild_settings (guild_id, ticket_channel_id, category_id, team_role_id, log_channel_id, timezone, embed_title, embed_description) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+
+
+class TicketStore:
+    """Async repository for the ticket tables and per-guild ticket settings.
+
+    All sqlite work runs off the event loop: writes are serialized on a single
+    writer thread, reads are spread over a small pool of reader threads that each
+    own their connection. The database runs in WAL mode so readers never wait on
+    the writer.
+    """
+
+    def __init__(self, path: str = DATABASE_FILE, readers: int = READER_COUNT):
+        self.path = path
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ticket-db-writer")
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="ticket-db-reader")
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._closed = False
+        # Schema setup is the first job on the writer; readers wait for it once.
+        self._ready: Future = self._writer.submit(self._init_schema)
+
+    def _connect(self, read_only: bool) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0, cached_statements=STATEMENT_CACHE_SIZE, check_same_thread=False)
+        conn.execute("PRAGMA busy_timeout=5000")
+        if read_only:
+            conn.execute("PRAGMA query_only=ON")
+        else:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def _connection(self, read_only: bool) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if read_only:
+                self._ready.result()
+            conn = self._connect(read_only)
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._connection(read_only=False)
+        conn.execute(CREATE_TABLE)
+        conn.execute(CREATE_MESSAGE_TABLE)
+        conn.execute(CREATE_MESSAGE_INDEX)
+        conn.execute(CREATE_SETTINGS_TABLE)
+        self._add_columns(conn)
+        if self._has_unique_creator(conn):
+            self._rebuild_ticket_table(conn)
+        conn.execute(CREATE_CREATOR_INDEX)
+        conn.execute(CREATE_STATE_INDEX)
+        conn.commit()
+
+    @staticmethod
+    def _add_columns(conn: sqlite3.Connection):
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(ticket)")}
+        for column, definition in MIGRATED_COLUMNS.items():
+            if column not in existing:
+                conn.execute(f"ALTER TABLE ticket ADD COLUMN {column} {definition}")
+
+    @staticmethod
+    def _has_unique_creator(conn: sqlite3.Connection) -> bool:
+        for _, name, unique, *_ in conn.execute("PRAGMA index_list(ticket)").fetchall():
+            if unique and [row[2] for row in conn.execute(f"PRAGMA index_info({name})")] == ["discord_id"]:
+                return True
+        return False
+
+    def _rebuild_ticket_table(self, conn: sqlite3.Connection):
+        columns = ", ".join(row[1] for row in conn.execute("PRAGMA table_info(ticket)"))
+        conn.execute(RENAME_LEGACY_TABLE)
+        conn.execute(CREATE_TABLE)
+        self._add_columns(conn)
+        conn.execute(f"INSERT INTO ticket ({columns}) SELECT {columns} FROM ticket_legacy")
+        # Ticket numbers keep counting from where they were, even past deleted rows
+        conn.execute(KEEP_LEGACY_SEQUENCE)
+        conn.execute(DROP_LEGACY_TABLE)
+
+    def _read(self, sql: str, params: tuple = (), fetch_all: bool = False):
+        cur = self._connection(read_only=True).execute(sql, params)
+        try:
+            return cur.fetchall() if fetch_all else cur.fetchone()
+        finally:
+            cur.close()
+
+    def _write(self, sql: str, params: tuple = ()) -> Tuple[int, int]:
+        conn = self._connection(read_only=False)
+        cur = conn.execute(sql, params)
+        conn.commit()
+        return cur.lastrowid, cur.rowcount
+
+    def _reserve_ticket(self, guild_id: int, discord_name: str, discord_id: int, created_at: int) -> Optional[int]:
+        conn = self._connection(read_only=False)
+        try:
+            # The UNIQUE index on (guild_id, discord_id) makes the insert itself the duplicate check,
+            # and the row id it hands back is the ticket number.
+            cur = conn.execute(INSERT_TICKET, (guild_id, discord_name, discord_id, created_at))
+        except sqlite3.IntegrityError:
+            conn.rollback()
+            return None
+        conn.commit()
+        return cur.lastrowid
+
+    def _delete_ticket(self, channel_id: int):
+        conn = self._connection(read_only=False)
+        conn.execute(DELETE_BY_CHANNEL, (channel_id,))
+        conn.execute(DELETE_MESSAGES, (channel_id,))
+        conn.commit()
+
+    def _increment_close_attempts(self, channel_id: int) -> int:
+        # Runs on the writer so the read sees the update that was just made
+        conn = self._connection(read_only=False)
+        conn.execute(INCREMENT_CLOSE_ATTEMPTS, (channel_id,))
+        conn.commit()
+        row = conn.execute(SELECT_CLOSE_ATTEMPTS, (channel_id,)).fetchone()
+        return row[0] if row else 0
+
+    async def _run(self, executor: ThreadPoolExecutor, func, *args):
+        if self._closed:
+            raise RuntimeError("TicketStore is closed")
+        return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+    async def read(self, sql: str, params: tuple = (), fetch_all: bool = False):
+        return await self._run(self._readers, self._read, sql, params, fetch_all)
+
+    async def write(self, sql: str, params: tuple = ()) -> Tuple[int, int]:
+        """Run a write statement and return its (lastrowid, rowcount)."""
+        return await self._run(self._writer, self._write, sql, params)
+
+    async def get_ticket_by_channel(self, channel_id: int) -> Optional[Tuple[int, int, int, str]]:
+        """Return (id, discord_id, created_at, state) for the ticket in this channel."""
+        return await self.read(SELECT_BY_CHANNEL, (channel_id,))
+
+    async def get_creator_id(self, channel_id: int) -> Optional[int]:
+        row = await self.read(SELECT_CREATOR, (channel_id,))
+        return row[0] if row else None
+
+    async def has_open_ticket(self, guild_id: int, user_id: int) -> bool:
+        return await self.read(SELECT_BY_CREATOR, (guild_id, user_id)) is not None
+
+    async def reserve_ticket(self, guild_id: int, discord_name: str, discord_id: int, created_at: int) -> Optional[int]:
+        """Insert a ticket row and return its id, or None if the user already has a ticket in this guild.
+
+        The insert runs on the single writer thread in its own transaction, so
+        concurrent requests always get distinct ids and at most one per user and guild wins.
+        """
+        return await self._run(self._writer, self._reserve_ticket, guild_id, discord_name, discord_id, created_at)
+
+    async def release_ticket(self, ticket_id: int):
+        """Drop a reserved row whose channel never got created."""
+        await self.write(DELETE_BY_ID, (ticket_id,))
+
+    async def delete_orphans(self, created_before: int) -> int:
+        """Remove reserved rows that never got a channel, e.g. after a crash mid-creation."""
+        _, rowcount = await self.write(DELETE_ORPHANS, (created_before,))
+        return rowcount
+
+    async def set_ticket_channel(self, ticket_id: int, channel_id: int):
+        await self.write(UPDATE_CHANNEL, (channel_id, ticket_id))
+
+    async def delete_ticket(self, channel_id: int):
+        """Remove the ticket row together with its captured messages."""
+        await self._run(self._writer, self._delete_ticket, channel_id)
+
+    async def owners(self) -> List[Tuple[int, int, Optional[int]]]:
+        """(guild id, creator id, channel id) for every ticket, the channel is None while it is still being created."""
+        return await self.read(SELECT_OWNERS, fetch_all=True)
+
+    async def guild_settings(self) -> List[tuple]:
+        return await self.read(SELECT_GUILD_SETTINGS, fetch_all=True)
+
+    async def save_guild_settings(self, settings: tuple):
+        """Insert or replace one guild's settings row, in SELECT_GUILD_SETTINGS column order."""
+        await self.write(SAVE_GUILD_SETTINGS, tuple(settings))
+
+    async def add_message(self, message_id: int, channel_id: int, author_id: int, author_name: str, author_avatar: Optional[str],
+                          content: str, extra: Optional[str], created_at: float):
+        await self.write(INSERT_MESSAGE, (message_id, channel_id, author_id, author_name, author_avatar, content, extra, created_at))
+
+    async def edit_message(self, message_id: int, content: str, extra: Optional[str], edited_at: Optional[float]):
+        """Update a captured message; an ``edited_at`` of None keeps the previous one."""
+        await self.write(UPDATE_MESSAGE, (content, extra, edited_at, message_id))
+
+    async def mark_message_deleted(self, message_id: int):
+        await self.write(MARK_MESSAGE_DELETED, (message_id,))
+
+    async def get_messages(self, channel_id: int) -> List[tuple]:
+        return await self.read(SELECT_MESSAGES, (channel_id,), fetch_all=True)
+
+    async def claim_ticket(self, channel_id: int, claimer_id: int, claimed_at: int) -> bool:
+        """Move an open ticket to claimed. Returns False if it was not open."""
+        _, rowcount = await self.write(CLAIM_TICKET, (claimer_id, claimed_at, channel_id))
+        return rowcount > 0
+
+    async def unclaim_ticket(self, channel_id: int, claimer_id: int):
+        """Move a ticket claimed by ``claimer_id`` back to open, e.g. when applying the claim failed."""
+        await self.write(UNCLAIM_TICKET, (channel_id, claimer_id))
+
+    async def queue_close(self, channel_id: int, reason: Optional[str], closer_id: int, closer_name: str) -> bool:
+        """Move an open or claimed ticket, or one whose close failed, to closing. Returns False if it is already closing."""
+        _, rowcount = await self.write(QUEUE_CLOSE, (reason, closer_id, closer_name, channel_id))
+        return rowcount > 0
+
+    async def get_close_job(self, channel_id: int) -> Optional[tuple]:
+        return await self.read(SELECT_CLOSE_JOB, (channel_id,))
+
+    async def pending_closes(self) -> List[int]:
+        rows = await self.read(SELECT_PENDING_CLOSES, fetch_all=True)
+        return [row[0] for row in rows]
+
+    async def set_close_state(self, channel_id: int, state: str):
+        await self.write(UPDATE_CLOSE_STATE, (state, channel_id))
+
+    async def mark_transcript_delivered(self, channel_id: int, destination: str):
+        """Record that the transcript reached ``destination`` ("dm" or "log")."""
+        await self.write(MARK_DM_DELIVERED if destination == "dm" else MARK_LOG_DELIVERED, (channel_id,))
+
+    async def record_close_attempt(self, channel_id: int) -> int:
+        return await self._run(self._writer, self._increment_close_attempts, channel_id)
+
+    async def backfill_created_at(self, convert) -> int:
+        """Fill created_at for rows that only have the old ticket_created string, using ``convert(string) -> epoch``."""
+        rows = await self.read(SELECT_LEGACY_CREATED, fetch_all=True)
+        for ticket_id, ticket_created in rows:
+            await self.write(UPDATE_CREATED_AT, (convert(ticket_created), ticket_id))
+        return len(rows)
+
+    async def backfill_guild(self, guild_id: int) -> int:
+        """Assign tickets from before tickets were per guild to ``guild_id``, the one guild the bot served then."""
+        _, rowcount = await self.write(BACKFILL_GUILD, (guild_id,))
+        return rowcount
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+
+ticket_store = TicketStore()
@@ -0,0 +1,194 @@
+import contextvars
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, List, Optional, Tuple
+
+import discord
+from discord import app_commands
+
+with open("config.json", mode="r") as config_file:
+    config = json.load(config_file)
+
+# Finished traces kept in memory; older ones fall off the ring buffer
+TRACE_BUFFER_SIZE = config.get("trace_buffer_size", 2000)
+TRACE_DUMP_PATH = config.get("trace_dump_path", "traces.jsonl")
+# Traces that never finish (e.g. a callback stuck forever) are dropped past this many
+MAX_OPEN_TRACES = 500
+
+
+class Trace:
+    """One command run: total wall time plus named phase spans (defer, api, db, send, ...)."""
+
+    __slots__ = ("command", "started_at", "start", "duration", "spans", "error")
+
+    def __init__(self, command: str):
+        self.command = command
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.spans: List[Tuple[str, float]] = []
+        self.error: Optional[str] = None
+
+    def phases(self) -> Dict[str, float]:
+        """Time per phase, with whatever no span covered reported as 'other'."""
+        totals: Dict[str, float] = {}
+        for phase, seconds in self.spans:
+            totals[phase] = totals.get(phase, 0.0) + seconds
+        totals["other"] = max(self.duration - sum(totals.values()), 0.0)
+        return totals
+
+    def to_dict(self) -> dict:
+        return {
+            "command": self.command,
+            "started_at": self.started_at,
+            "duration": self.duration,
+            "spans": self.spans,
+            "error": self.error,
+        }
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(max(int(q * len(sorted_values) + 0.5) - 1, 0), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+class Tracer:
+    """Collects per-command traces into a ring buffer.
+
+    App commands are traced by ``TracingCommandTree``; other entry points such
+    as buttons wrap themselves in ``trace(name)``. Code inside either marks its
+    phases with ``span(phase)``, which finds the current trace through a
+    context variable and does nothing when there is none.
+    """
+
+    def __init__(self, size: int = TRACE_BUFFER_SIZE):
+        self.traces: Deque[Trace] = deque(maxlen=size)
+        self._open: Dict[int, Trace] = {}
+        self._current: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("current_trace", default=None)
+
+    def begin(self, key: int, command: str) -> Trace:
+        if len(self._open) >= MAX_OPEN_TRACES:
+            self._open.pop(next(iter(self._open)))
+        trace = Trace(command)
+        self._open[key] = trace
+        self._current.set(trace)
+        return trace
+
+    def finish(self, key: int, error: Optional[BaseException] = None):
+        trace = self._open.pop(key, None)
+        if trace is not None:
+            self._close(trace, error)
+
+    def _close(self, trace: Trace, error: Optional[BaseException]):
+        trace.duration = time.perf_counter() - trace.start
+        if error is not None:
+            trace.error = type(error).__name__
+        self.traces.append(trace)
+
+    @contextmanager
+    def trace(self, command: str):
+        """Trace a block that is not an app command, e.g. a button callback."""
+        trace = Trace(command)
+        token = self._current.set(trace)
+        error = None
+        try:
+            yield trace
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            self._current.reset(token)
+            self._close(trace, error)
+
+    @contextmanager
+    def span(self, phase: str):
+        trace = self._current.get()
+        if trace is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            trace.spans.append((phase, time.perf_counter() - start))
+
+    def stats(self) -> Dict[str, dict]:
+        """p50/p95/p99 of the total and of every phase, per command, over the ring buffer."""
+        totals: Dict[str, List[float]] = {}
+        phases: Dict[str, Dict[str, List[float]]] = {}
+        errors: Dict[str, int] = {}
+        for trace in self.traces:
+            totals.setdefault(trace.command, []).append(trace.duration)
+            errors[trace.command] = errors.get(trace.command, 0) + (trace.error is not None)
+            for phase, seconds in trace.phases().items():
+                phases.setdefault(trace.command, {}).setdefault(phase, []).append(seconds)
+
+        result = {}
+        for command, durations in totals.items():
+            durations.sort()
+            entry = {
+                "count": len(durations),
+                "errors": errors[command],
+                "p50": percentile(durations, 0.50),
+                "p95": percentile(durations, 0.95),
+                "p99": percentile(durations, 0.99),
+                "phases": {},
+            }
+            for phase, values in phases[command].items():
+                values.sort()
+                entry["phases"][phase] = {
+                    "p50": percentile(values, 0.50),
+                    "p95": percentile(values, 0.95),
+                    "p99": percentile(values, 0.99),
+                }
+            result[command] = entry
+        return result
+
+    def dump(self, path: str = TRACE_DUMP_PATH) -> int:
+        """Append every buffered trace to ``path`` as JSON lines and return how many were written."""
+        traces = list(self.traces)
+        with open(path, mode="a") as dump_file:
+            for trace in traces:
+                dump_file.write(json.dumps(trace.to_dict()) + "\n")
+        return len(traces)
+
+
+tracer = Tracer()
+span = tracer.span
+
+
+class TracingCommandTree(app_commands.CommandTree):
+    """Command tree that opens a trace before each app command runs and closes it when it completes or fails."""
+
+    def __init__(self, client: discord.Client, *args, **kwargs):
+        super().__init__(client, *args, **kwargs)
+        client.add_listener(self._trace_completion, "on_app_command_completion")
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # Runs in the same task as the command callback, so spans inside it see this trace
+        if interaction.type is discord.InteractionType.application_command:
+            tracer.begin(interaction.id, self._command_name(interaction))
+        return True
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        tracer.finish(interaction.id, error)
+        await super().on_error(interaction, error)
+
+    async def _trace_completion(self, interaction: discord.Interaction, command):
+        tracer.finish(interaction.id)
+
+    @staticmethod
+    def _command_name(interaction: discord.Interaction) -> str:
+        data = interaction.data or {}
+        name = data.get("name", "unknown")
+        options = data.get("options", [])
+        # Subcommands and groups are nested options of type 1 and 2
+        while options and options[0].get("type") in (1, 2):
+            name = f"{name} {options[0]['name']}"
+            options = options[0].get("options", [])
+        return f"/{name}"
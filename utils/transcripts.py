@@ -0,0 +1,161 @@
+import asyncio
+import gzip
+import html
+import importlib
+import io
+import json
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
+
+import discord
+import pytz
+from discord import Embed
+
+from utils.ticket_store import ticket_store
+
+# Transcripts above this size are gzipped before upload
+COMPRESS_THRESHOLD = 1024 * 1024
+COMPRESS_LEVEL = 6
+
+
+class Transcript:
+    """A ticket transcript that has been rendered and encoded exactly once.
+
+    Every destination gets its own ``discord.File`` (uploads consume and close
+    their file object), but all of them read from the same immutable buffer.
+    """
+
+    def __init__(self, data: bytes, filename: str):
+        self.data = data
+        self.filename = filename
+
+    @property
+    def compressed(self) -> bool:
+        return self.filename.endswith(".gz")
+
+    def to_file(self) -> discord.File:
+        # BytesIO initialised from bytes shares the buffer instead of copying it
+        return discord.File(io.BytesIO(self.data), filename=self.filename)
+
+
+TRANSCRIPT_STYLE = """body{background:#313338;color:#dbdee1;font-family:sans-serif;margin:0;padding:16px}
+.msg{display:flex;gap:12px;padding:6px 0}.msg img{width:40px;height:40px;border-radius:50%}
+.author{font-weight:600;color:#f2f3f5}.time,.flag{color:#949ba4;font-size:12px;margin-left:6px}
+.content{white-space:pre-wrap;word-wrap:break-word}.deleted .content{text-decoration:line-through;color:#949ba4}
+.embed{border-left:4px solid #5865f2;background:#2b2d31;padding:6px 10px;margin-top:4px;border-radius:4px}"""
+
+
+def _timezone(name: str):
+    try:
+        return pytz.timezone(name)
+    except pytz.UnknownTimeZoneError:
+        print(f"Warning: Unknown timezone '{name}'. Using UTC.")
+        return pytz.utc
+
+
+def render_html(channel_name: str, messages: List[tuple], timezone: str) -> str:
+    """Render captured ticket messages (rows from ``TicketStore.get_messages``) as a standalone HTML page."""
+    tz = _timezone(timezone)
+    escape = html.escape
+    parts = [f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{escape(channel_name)}</title>"
+             f"<style>{TRANSCRIPT_STYLE}</style></head><body><h2>#{escape(channel_name)}</h2>"]
+
+    for author_id, author_name, author_avatar, content, extra, created_at, edited_at, deleted in messages:
+        sent = datetime.fromtimestamp(created_at, tz).strftime("%Y-%m-%d %H:%M:%S")
+        flags = ""
+        if edited_at:
+            flags += "<span class=\"flag\">(edited)</span>"
+        if deleted:
+            flags += "<span class=\"flag\">(deleted)</span>"
+
+        body = f"<div class=\"content\">{escape(content or '')}</div>"
+        if extra:
+            extra = json.loads(extra)
+            for embed in extra.get("embeds", []):
+                title = f"<b>{escape(embed['title'])}</b><br>" if embed.get("title") else ""
+                body += f"<div class=\"embed\">{title}<span class=\"content\">{escape(embed.get('description') or '')}</span></div>"
+            for attachment in extra.get("attachments", []):
+                body += f"<div><a href=\"{escape(attachment['url'])}\">{escape(attachment['filename'])}</a></div>"
+
+        parts.append(
+            f"<div class=\"msg{' deleted' if deleted else ''}\"><img src=\"{escape(author_avatar or '')}\" alt=\"\">"
+            f"<div><span class=\"author\" title=\"{author_id}\">{escape(author_name or str(author_id))}</span>"
+            f"<span class=\"time\">{sent}</span>{flags}{body}</div></div>"
+        )
+
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+async def render_transcript(channel: discord.TextChannel, bot, timezone: str) -> Optional[Transcript]:
+    messages = await ticket_store.get_messages(channel.id)
+    if messages:
+        html_text = await asyncio.to_thread(render_html, channel.name, messages, timezone)
+    else:
+        # Tickets opened before message capture existed have no local log, export the whole history once.
+        # chat_exporter is only needed here, so it is imported on first use and off the event loop.
+        chat_exporter = await asyncio.to_thread(importlib.import_module, "chat_exporter")
+        html_text = await chat_exporter.export(channel, limit=None, tz_info=timezone, military_time=True, bot=bot)
+    if html_text is None:
+        return None
+
+    data = html_text.encode()
+    filename = f"transcript-{channel.name}.html"
+    if len(data) > COMPRESS_THRESHOLD:
+        data = await asyncio.to_thread(gzip.compress, data, COMPRESS_LEVEL)
+        filename += ".gz"
+    return Transcript(data, filename)
+
+
+async def deliver_transcript(embed: Embed, transcript: Optional[Transcript], creator: Optional[discord.abc.User], log_channel,
+                             send_dm: bool = True, send_log: bool = True,
+                             on_delivered: Optional[Callable[[str], Awaitable[None]]] = None):
+    """Send the transcript embed (and file) to the ticket creator and the log channel at the same time.
+
+    The log message is sent without waiting for the DM, so if the creator has DMs
+    disabled the log embed is edited afterwards to note it. Each destination
+    that is done is passed to ``on_delivered`` ("dm" or "log"); a retry passes
+    ``send_dm``/``send_log`` as False for those so nobody gets it twice. If
+    either send fails the error is raised once both have finished.
+    """
+    if creator is None:
+        embed.add_field(name="Note", value="Ticket creator no longer in the server.", inline=True)
+
+    async def delivered(destination: str):
+        if on_delivered is not None:
+            await on_delivered(destination)
+
+    async def send_to_creator() -> bool:
+        if creator is None or not send_dm:
+            return True
+        try:
+            await creator.send(embed=embed, file=transcript.to_file() if transcript else None)
+        except discord.errors.Forbidden:
+            # DMs disabled; retrying won't change that
+            await delivered("dm")
+            return False
+        await delivered("dm")
+        return True
+
+    async def send_to_log() -> Optional[discord.Message]:
+        if not send_log:
+            return None
+        if log_channel is None:
+            print("Log channel not found. Transcript not sent to log channel.")
+            return None
+        if transcript:
+            message = await log_channel.send(embed=embed, file=transcript.to_file())
+        else:
+            message = await log_channel.send(embed=embed) # Send embed without file if transcript failed
+        await delivered("log")
+        return message
+
+    dm_result, log_result = await asyncio.gather(send_to_creator(), send_to_log(), return_exceptions=True)
+    for result in (dm_result, log_result):
+        if isinstance(result, BaseException):
+            raise result
+
+    if not dm_result:
+        embed.add_field(name="Error", value="Ticket Creator DM`s are disabled", inline=True)
+        if log_result:
+            await log_result.edit(embed=embed)